@@ -87,18 +87,21 @@ async def sign_websocket(websocket: WebSocket, sign_id: str):
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
+            # Signs coalesce frames queued in the same tick into one "batch"
+            items = message.get("items", []) if message.get("type") == "batch" else [message]
             
-            if message.get("type") == "heartbeat":
-                # Process heartbeat from sign
-                await process_sign_heartbeat(sign_id, message.get("data", {}))
-                
-            elif message.get("type") == "metrics":
-                # Process crowd/impression metrics
-                await process_sign_metrics(sign_id, message.get("data", {}))
-                
-            elif message.get("type") == "ack":
-                # Sign acknowledged message receipt
-                await process_message_ack(sign_id, message.get("message_id"))
+            for message in items:
+                if message.get("type") == "heartbeat":
+                    # Process heartbeat from sign
+                    await process_sign_heartbeat(sign_id, message.get("data", {}))
+                    
+                elif message.get("type") == "metrics":
+                    # Process crowd/impression metrics
+                    await process_sign_metrics(sign_id, message.get("data", {}))
+                    
+                elif message.get("type") == "ack":
+                    # Sign acknowledged message receipt
+                    await process_message_ack(sign_id, message.get("message_id"))
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
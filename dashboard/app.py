@@ -11,12 +11,14 @@ backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
 if os.path.exists(backend_path):
     sys.path.insert(0, os.path.abspath(backend_path))
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from contextlib import asynccontextmanager
 from datetime import datetime
+import hashlib
 import json
 
 # Import from backend
@@ -222,13 +224,16 @@ async def sign_websocket(websocket: WebSocket, sign_id: str):
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
+            # Signs coalesce frames queued in the same tick into one "batch"
+            items = message.get("items", []) if message.get("type") == "batch" else [message]
             
-            if message.get("type") == "heartbeat":
-                await process_sign_heartbeat(sign_id, message.get("data", {}))
-            elif message.get("type") == "metrics":
-                await process_sign_metrics(sign_id, message.get("data", {}))
-            elif message.get("type") == "ack":
-                await process_message_ack(sign_id, message.get("message_id"))
+            for message in items:
+                if message.get("type") == "heartbeat":
+                    await process_sign_heartbeat(sign_id, message.get("data", {}))
+                elif message.get("type") == "metrics":
+                    await process_sign_metrics(sign_id, message.get("data", {}))
+                elif message.get("type") == "ack":
+                    await process_message_ack(sign_id, message.get("message_id"))
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -408,9 +413,13 @@ async def create_template(template: TemplateCreate, db=Depends(get_db)):
 
 
 @app.get("/api/templates", tags=["Templates"])
-async def list_templates(db=Depends(get_db)):
-    """List all templates"""
-    return [t.to_dict() for t in db.query(Template).all()]
+async def list_templates(request: Request, db=Depends(get_db)):
+    """List all templates (ETag'd so signs can revalidate without re-downloading)"""
+    body = json.dumps(jsonable_encoder([t.to_dict() for t in db.query(Template).all()]))
+    etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 
 @app.get("/api/templates/{template_id}", tags=["Templates"])
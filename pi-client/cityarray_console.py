@@ -3,6 +3,7 @@
 CITYARRAY Console - Type messages to display and speak
 """
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
 import sys
 
@@ -12,9 +13,15 @@ CONFIG = {
     "piper_model": "/home/eion88/.local/share/piper/en_US-lessac-medium.onnx",
 }
 
+# Shared keep-alive session so repeat sign posts reuse one connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+COLORS = frozenset(["red", "amber", "yellow", "green", "cyan", "blue", "purple", "white"])
+
 def sign_post(endpoint, data):
     try:
-        requests.post(f"http://{CONFIG['sign_ip']}{endpoint}", json=data, timeout=2)
+        SESSION.post(f"http://{CONFIG['sign_ip']}{endpoint}", json=data, timeout=2)
     except:
         print("[SIGN] Connection failed")
 
@@ -30,35 +37,42 @@ def speak(text):
     except:
         print("[SPEAK] Audio failed")
 
+def _big(upper, color):
+    sign_post("/big", {"text": upper, "color": color})
+    print(f"[SIGN BIG] {upper}")
+
+def _single(upper, color):
+    sign_post("/display", {"text": upper, "color": color})
+    print(f"[SIGN] {upper}")
+
+def _scroll(upper, color):
+    sign_post("/scroll", {"text": f"   {upper}   ", "color": color, "dir": "left"})
+    print(f"[SIGN SCROLL] {upper}")
+
+def _maybe_twoline(upper, color):
+    words = upper.split()
+    if len(words) < 2:
+        return _scroll(upper, color)
+    mid = len(words) // 2
+    line1 = " ".join(words[:mid])
+    line2 = " ".join(words[mid:])
+    if len(line1) <= 10 and len(line2) <= 10:
+        sign_post("/twoline", {"line1": line1, "line2": line2, "color": color})
+        print(f"[SIGN] {line1} / {line2}")
+    else:
+        _scroll(upper, color)
+
+# Max message length -> display mode, checked in order; longer text scrolls
+_BUCKETS = [(5, _big), (10, _single), (21, _maybe_twoline)]
+
 def display_message(text, color="cyan"):
     """Auto-format message for sign based on length"""
-    text = text.strip()
-    
-    if len(text) <= 5:
-        # Big text
-        sign_post("/big", {"text": text.upper(), "color": color})
-        print(f"[SIGN BIG] {text.upper()}")
-    elif len(text) <= 10:
-        # Single line
-        sign_post("/display", {"text": text.upper(), "color": color})
-        print(f"[SIGN] {text.upper()}")
-    elif " " in text and len(text) <= 21:
-        # Try two lines
-        words = text.split()
-        mid = len(words) // 2
-        line1 = " ".join(words[:mid]) if mid > 0 else words[0]
-        line2 = " ".join(words[mid:]) if mid > 0 else " ".join(words[1:])
-        if len(line1) <= 10 and len(line2) <= 10:
-            sign_post("/twoline", {"line1": line1.upper(), "line2": line2.upper(), "color": color})
-            print(f"[SIGN] {line1.upper()} / {line2.upper()}")
-        else:
-            # Scroll
-            sign_post("/scroll", {"text": f"   {text.upper()}   ", "color": color, "dir": "left"})
-            print(f"[SIGN SCROLL] {text.upper()}")
-    else:
-        # Scroll
-        sign_post("/scroll", {"text": f"   {text.upper()}   ", "color": color, "dir": "left"})
-        print(f"[SIGN SCROLL] {text.upper()}")
+    upper = text.strip().upper()
+    length = len(upper)
+    for limit, show in _BUCKETS:
+        if length <= limit:
+            return show(upper, color)
+    _scroll(upper, color)
 
 def main():
     print("=" * 50)
@@ -103,7 +117,7 @@ def main():
             if cmd == "/q" or cmd == "/quit":
                 break
             elif cmd == "/color":
-                if arg in ["red", "amber", "yellow", "green", "cyan", "blue", "purple", "white"]:
+                if arg in COLORS:
                     color = arg
                     print(f"Color set to {color}")
                 else:
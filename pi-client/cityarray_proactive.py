@@ -7,7 +7,10 @@ Ctrl+C to stop
 """
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pytz
 import sys
@@ -19,15 +22,21 @@ CONFIG = {
     "openweather_key": "fd9375b142b3e1233b7b2aa0160762b5",
     "airnow_key": "098A2695-A585-4D29-BDB9-D4BEFFC0A402",
     "slide_duration": 5,
+    "refresh_interval": 120,  # seconds between weather/air fetches
 }
 
+# Shared keep-alive session so repeat calls skip the TCP/TLS handshake
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 # ============================================================================
 # SIGN
 # ============================================================================
 
 def sign_post(endpoint, data):
     try:
-        requests.post(f"http://{CONFIG['sign_ip']}{endpoint}", json=data, timeout=2)
+        SESSION.post(f"http://{CONFIG['sign_ip']}{endpoint}", json=data, timeout=2)
     except:
         pass
 
@@ -45,42 +54,66 @@ def sign_display(text, color):
 # ============================================================================
 
 weather_cache = None
-weather_time = 0
 air_cache = None
-air_time = 0
+data_rev = 0  # bumped whenever the refresher stores new data
 
-def get_weather():
-    global weather_cache, weather_time
-    if weather_cache and time.time() - weather_time < 120:
-        return weather_cache
+# Worker pool for fetches that can run side by side
+_POOL = ThreadPoolExecutor(max_workers=4)
+
+def fetch_weather():
     try:
-        r = requests.get(
+        r = SESSION.get(
             f"https://api.openweathermap.org/data/2.5/weather?lat=34.05&lon=-118.24&appid={CONFIG['openweather_key']}&units=imperial",
             timeout=5).json()
-        weather_cache = {"f": round(r['main']['temp']), "c": round((r['main']['temp']-32)*5/9), "desc": r['weather'][0]['description']}
-        weather_time = time.time()
-        return weather_cache
+        f = round(r['main']['temp'])
+        c = round((r['main']['temp']-32)*5/9)
+        desc = r['weather'][0]['description']
+        # Display strings are built once per fetch instead of per slide
+        return {"f": f, "c": c, "desc": desc, "temp_line": f"{f}F/{c}C", "desc_upper10": desc[:10].upper()}
     except:
-        return {"f": 72, "c": 22, "desc": "clear"}
+        return None
 
-def get_air():
-    global air_cache, air_time
-    if air_cache and time.time() - air_time < 120:
-        return air_cache
+def fetch_air():
     try:
-        r = requests.get(
+        r = SESSION.get(
             f"https://www.airnowapi.org/aq/observation/latLong/current/?format=application/json&latitude=34.05&longitude=-118.24&distance=25&API_KEY={CONFIG['airnow_key']}",
             timeout=5).json()
         if r:
-            air_cache = {"aqi": r[0]['AQI'], "cat": r[0]['Category']['Name']}
-            air_time = time.time()
-            return air_cache
+            return {"aqi": r[0]['AQI'], "cat": r[0]['Category']['Name']}
     except:
         pass
-    return {"aqi": 42, "cat": "Good"}
+    return None
+
+class Refresher(threading.Thread):
+    """Background thread that keeps the weather/air caches warm"""
+    
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.running = True
+    
+    def run(self):
+        global weather_cache, air_cache, data_rev
+        while self.running:
+            # Both requests are in flight at once, so a refresh costs max() not sum()
+            weather_future = _POOL.submit(fetch_weather)
+            air_future = _POOL.submit(fetch_air)
+            weather = weather_future.result() or weather_cache
+            air = air_future.result() or air_cache
+            if (weather, air) != (weather_cache, air_cache):
+                weather_cache, air_cache = weather, air
+                data_rev += 1
+            time.sleep(CONFIG["refresh_interval"])
+
+def get_weather():
+    return weather_cache or {"f": 72, "c": 22, "desc": "clear", "temp_line": "72F/22C", "desc_upper10": "CLEAR"}
+
+def get_air():
+    return air_cache or {"aqi": 42, "cat": "Good"}
+
+TZ = pytz.timezone("America/Los_Angeles")
 
 def get_time():
-    return datetime.now(pytz.timezone("America/Los_Angeles")).strftime("%I:%M %p")
+    return datetime.now(TZ).strftime("%I:%M %p")
 
 # ============================================================================
 # SLIDES
@@ -122,7 +155,7 @@ def city_slides():
     aqi_color = "green" if a['aqi'] <= 50 else "amber" if a['aqi'] <= 100 else "red"
     return [
         ("twoline", get_time(), "LOS ANGELES", "cyan"),
-        ("twoline", f"{w['f']}F/{w['c']}C", w['desc'][:10].upper(), "cyan"),
+        ("twoline", w['temp_line'], w['desc_upper10'], "cyan"),
         ("twoline", f"AQI: {a['aqi']}", a['cat'][:10].upper(), aqi_color),
         ("twoline", "METRO", "ON TIME", "green"),
         ("twoline", "CITY HALL", "OPEN 8-5", "cyan"),
@@ -134,7 +167,7 @@ def general_slides():
     w = get_weather()
     return [
         ("twoline", get_time(), "CITYARRAY", "green"),
-        ("twoline", f"{w['f']}F/{w['c']}C", w['desc'][:10].upper(), "cyan"),
+        ("twoline", w['temp_line'], w['desc_upper10'], "cyan"),
         ("twoline", "ASK ME", "ANYTHING", "green"),
         ("twoline", "NEED HELP?", "HEY CITY", "green"),
     ]
@@ -168,6 +201,9 @@ def main():
     print("=" * 50)
     print()
     
+    # Keep weather/air fresh off the display loop
+    Refresher().start()
+    
     # Announce
     color = AGENTS[agent]["color"]
     sign_twoline(agent.upper(), "MODE ON", color)
@@ -187,10 +223,15 @@ def main():
     time.sleep(2)
     
     slide_idx = 0
+    deck_key = None
     
     try:
         while True:
-            slides = AGENTS[agent]["slides"]()
+            # Rebuild the deck only when data or the clock minute changed
+            key = (data_rev, time.strftime("%H:%M"))
+            if key != deck_key:
+                slides = AGENTS[agent]["slides"]()
+                deck_key = key
             slide = slides[slide_idx % len(slides)]
             
             # Display slide
@@ -6,14 +6,31 @@ CITYARRAY Control System
 - OPTIONAL: Voice input/output (console-controlled)
 """
 import subprocess
+import io
+import socket
+import wave
+from collections import deque
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import json
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import pytz
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # pip install orjson; stdlib json is used without it
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None  # pip install webrtcvad; listen() records the full window without it
+
 from sign_formatter import SignFormatter, Translator, PHRASES
 
 # ============================================================================
@@ -28,10 +45,20 @@ CONFIG = {
     "piper_path": "/home/eion88/cityarray/piper/piper",
     "piper_model": "/home/eion88/.local/share/piper/en_US-lessac-medium.onnx",
     "whisper_path": "/home/eion88/cityarray/whisper.cpp",
+    "whisper_port": 9090,  # local whisper-server
     "slide_duration": 5,
+    "refresh_interval": 120,  # seconds between weather/air fetches
     "timezone": "America/Los_Angeles",
 }
 
+# Shared keep-alive session so repeat calls skip the TCP/TLS handshake
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Worker pool for fetches that can run side by side
+_POOL = ThreadPoolExecutor(max_workers=4)
+
 # System state - controlled by dashboard
 STATE = {
     "agent": "festival",
@@ -51,85 +78,252 @@ STATE = {
 class DataService:
     def __init__(self):
         self.cache = {}
-        self.cache_time = {}
-    
-    def _cached(self, key, fetch, duration=120):
-        now = time.time()
-        if key in self.cache and now - self.cache_time.get(key, 0) < duration:
-            return self.cache[key]
-        data = fetch()
-        if data:
-            self.cache[key] = data
-            self.cache_time[key] = now
-        return self.cache.get(key)
+        self.rev = 0  # bumped whenever refresh() stores new data
+        self.tz = pytz.timezone(CONFIG["timezone"])
+    
+    def _fetch_weather(self):
+        try:
+            r = SESSION.get(
+                f"https://api.openweathermap.org/data/2.5/weather?lat=34.05&lon=-118.24&appid={CONFIG['openweather_key']}&units=imperial",
+                timeout=5).json()
+            temp_f = round(r['main']['temp'])
+            temp_c = round((r['main']['temp'] - 32) * 5 / 9)
+            desc = r['weather'][0]['description']
+            return {
+                "temp_f": temp_f,
+                "temp_c": temp_c,
+                "desc": desc,
+                # Display strings, built once per fetch instead of per slide
+                "temp_line": f"{temp_f}F/{temp_c}C",
+                "desc_upper10": desc[:10].upper(),
+            }
+        except:
+            return None
+    
+    def _fetch_air(self):
+        try:
+            r = SESSION.get(
+                f"https://www.airnowapi.org/aq/observation/latLong/current/?format=application/json&latitude=34.05&longitude=-118.24&distance=25&API_KEY={CONFIG['airnow_key']}",
+                timeout=5).json()
+            if r:
+                return {"aqi": r[0]['AQI'], "cat": r[0]['Category']['Name']}
+        except:
+            return None
+    
+    def weather_future(self):
+        return _POOL.submit(self._fetch_weather)
+    
+    def air_future(self):
+        return _POOL.submit(self._fetch_air)
+    
+    def refresh(self):
+        """Fetch fresh data; keeps the last good value on failure"""
+        # Both requests are in flight at once, so a refresh costs max() not sum()
+        futures = (("weather", self.weather_future()), ("air", self.air_future()))
+        for key, future in futures:
+            data = future.result()
+            if data and data != self.cache.get(key):
+                self.cache[key] = data
+                self.rev += 1
     
     def weather(self):
-        def fetch():
-            try:
-                r = requests.get(
-                    f"https://api.openweathermap.org/data/2.5/weather?lat=34.05&lon=-118.24&appid={CONFIG['openweather_key']}&units=imperial",
-                    timeout=5).json()
-                return {
-                    "temp_f": round(r['main']['temp']),
-                    "temp_c": round((r['main']['temp'] - 32) * 5 / 9),
-                    "desc": r['weather'][0]['description']
-                }
-            except:
-                return None
-        return self._cached("weather", fetch) or {"temp_f": 72, "temp_c": 22, "desc": "clear"}
+        return self.cache.get("weather") or {
+            "temp_f": 72, "temp_c": 22, "desc": "clear",
+            "temp_line": "72F/22C", "desc_upper10": "CLEAR",
+        }
     
     def air(self):
-        def fetch():
-            try:
-                r = requests.get(
-                    f"https://www.airnowapi.org/aq/observation/latLong/current/?format=application/json&latitude=34.05&longitude=-118.24&distance=25&API_KEY={CONFIG['airnow_key']}",
-                    timeout=5).json()
-                if r:
-                    return {"aqi": r[0]['AQI'], "cat": r[0]['Category']['Name']}
-            except:
-                return None
-        return self._cached("air", fetch) or {"aqi": 42, "cat": "Good"}
+        return self.cache.get("air") or {"aqi": 42, "cat": "Good"}
     
     def time_str(self):
-        return datetime.now(pytz.timezone(CONFIG["timezone"])).strftime("%I:%M %p")
+        return datetime.now(self.tz).strftime("%I:%M %p")
+
+
+class DataRefresher(threading.Thread):
+    """Background thread that refreshes DataService so slides never wait on HTTP"""
+    
+    def __init__(self, data):
+        super().__init__(daemon=True)
+        self.data = data
+        self.running = True
+    
+    def run(self):
+        while self.running:
+            self.data.refresh()
+            time.sleep(CONFIG["refresh_interval"])
+    
+    def stop(self):
+        self.running = False
 
 
 # ============================================================================
 # AUDIO SERVICE (Console-controlled)
 # ============================================================================
 
+def _stop_process(proc):
+    """Terminate a child and reap it so it doesn't linger as a zombie"""
+    if proc is None:
+        return
+    if proc.poll() is None:
+        proc.terminate()
+    try:
+        proc.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
 class AudioService:
+    def __init__(self):
+        self.piper = None
+        self.aplay = None
+        self.whisper = None
+        self.whisper_ready = False  # set once the server accepts connections
+        self.lock = threading.Lock()
+    
+    def _start_pipeline(self):
+        """Start piper once, streaming its raw audio straight into aplay"""
+        self.piper = subprocess.Popen(
+            [CONFIG["piper_path"], "--model", CONFIG["piper_model"], "--output-raw"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+        )
+        self.aplay = subprocess.Popen(
+            ["aplay", "-D", "plughw:2,0", "-r", "22050", "-f", "S16_LE", "-c", "1"],
+            stdin=self.piper.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.piper.stdout.close()  # aplay holds the read end now
+    
+    def _pipeline_alive(self):
+        return (self.piper is not None and self.piper.poll() is None
+                and self.aplay.poll() is None)
+    
     def speak(self, text):
         """Speak text - only if audio enabled by console"""
         if not STATE["audio_enabled"]:
             return False
+        with self.lock:
+            try:
+                if not self._pipeline_alive():
+                    self._stop_pipeline()
+                    self._start_pipeline()
+                # piper synthesizes one utterance per input line
+                self.piper.stdin.write(" ".join(text.split()).encode() + b"\n")
+                return True
+            except:
+                self._stop_pipeline()
+                return False
+    
+    def _stop_pipeline(self):
+        """Stop the piper/aplay pipeline"""
+        if self.piper is not None and self.piper.stdin:
+            try:
+                self.piper.stdin.close()
+            except OSError:
+                pass
+        for proc in (self.piper, self.aplay):
+            _stop_process(proc)
+        self.piper = None
+        self.aplay = None
+    
+    def stop_whisper(self):
+        """Stop whisper-server"""
+        _stop_process(self.whisper)
+        self.whisper = None
+        self.whisper_ready = False
+    
+    def close(self):
+        """Stop the piper/aplay pipeline and whisper-server"""
+        self._stop_pipeline()
+        self.stop_whisper()
+    
+    def start_whisper(self):
+        """Start whisper-server once so the model stays loaded between commands"""
+        if self.whisper is None or self.whisper.poll() is not None:
+            self.whisper = subprocess.Popen([
+                f"{CONFIG['whisper_path']}/build/bin/whisper-server",
+                "-m", f"{CONFIG['whisper_path']}/models/ggml-tiny.en.bin",
+                "-l", "en", "--port", str(CONFIG["whisper_port"])
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.whisper_ready = False
+    
+    def wait_whisper(self, timeout=30):
+        """Block until whisper-server accepts connections (model loaded); True if it does"""
+        deadline = time.time() + timeout
+        while not self.whisper_ready:
+            if self.whisper is None or self.whisper.poll() is not None:
+                return False  # server died while loading
+            try:
+                socket.create_connection(("127.0.0.1", CONFIG["whisper_port"]), timeout=1).close()
+                self.whisper_ready = True
+            except OSError:
+                if time.time() > deadline:
+                    return False
+                time.sleep(0.2)
+        return True
+    
+    def _record_speech(self, max_seconds):
+        """Record until speech ends (VAD), at most max_seconds; WAV bytes or None"""
+        frame_bytes = 640  # 20 ms of 16 kHz mono S16_LE
+        vad = webrtcvad.Vad(3)
+        rec = subprocess.Popen([
+            "arecord", "-D", "plughw:2,0", "-f", "S16_LE", "-r", "16000", "-c", "1", "-t", "raw"
+        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        preroll = deque(maxlen=10)  # keep the onset that triggered detection
+        speech = []
+        voiced = silent = 0
         try:
-            p = subprocess.Popen(
-                [CONFIG["piper_path"], "--model", CONFIG["piper_model"], "--output-raw"],
-                stdin=subprocess.PIPE, stdout=subprocess.PIPE
-            )
-            audio, _ = p.communicate(text.encode())
-            subprocess.run(["aplay", "-D", "plughw:2,0", "-r", "22050", "-f", "S16_LE", "-c", "1"],
-                          input=audio, capture_output=True)
-            return True
-        except:
-            return False
+            for _ in range(max_seconds * 50):
+                frame = rec.stdout.read(frame_bytes)
+                if len(frame) < frame_bytes:
+                    break
+                is_speech = vad.is_speech(frame, 16000)
+                if not speech:
+                    preroll.append(frame)
+                    voiced = voiced + 1 if is_speech else 0
+                    if voiced >= 3:  # speech started
+                        speech.extend(preroll)
+                    continue
+                speech.append(frame)
+                silent = 0 if is_speech else silent + 1
+                if silent >= 25:  # 500 ms of silence: done
+                    break
+        finally:
+            _stop_process(rec)
+        if not speech:
+            return None
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(b"".join(speech))
+        return buf.getvalue()
     
     def listen(self, duration=5):
         """Listen for voice - only if voice input enabled by console"""
         if not STATE["voice_input_enabled"]:
             return None
         try:
-            subprocess.run([
-                "arecord", "-D", "plughw:2,0", "-d", str(duration), "-f", "S16_LE",
-                "-r", "16000", "-c", "1", "/tmp/cmd.wav"
-            ], capture_output=True)
-            result = subprocess.run([
-                f"{CONFIG['whisper_path']}/build/bin/whisper-cli",
-                "-m", f"{CONFIG['whisper_path']}/models/ggml-tiny.en.bin",
-                "-f", "/tmp/cmd.wav", "-l", "en", "--no-timestamps"
-            ], capture_output=True, text=True)
-            for line in result.stdout.strip().split('\n'):
+            self.start_whisper()
+            if webrtcvad:
+                audio = self._record_speech(duration)
+                if not audio:
+                    return None  # nobody spoke
+            else:
+                # WAV on stdout: the recording never touches the filesystem
+                audio = subprocess.run([
+                    "arecord", "-D", "plughw:2,0", "-d", str(duration), "-f", "S16_LE",
+                    "-r", "16000", "-c", "1", "-t", "wav", "-"
+                ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+            # The model may still be loading if the server was just (re)started
+            if not self.wait_whisper():
+                print("⚠️ whisper-server not ready")
+                return None
+            r = SESSION.post(
+                f"http://127.0.0.1:{CONFIG['whisper_port']}/inference",
+                files={"file": ("cmd.wav", audio, "audio/wav")},
+                data={"response_format": "json"}, timeout=30)
+            for line in r.json().get("text", "").strip().split('\n'):
                 line = line.strip()
                 if line and not line.startswith('['):
                     return line
@@ -182,7 +376,7 @@ def city_slides(data, formatter):
     aqi_color = "green" if a['aqi'] <= 50 else "amber" if a['aqi'] <= 100 else "red"
     slides = [
         {"line1": data.time_str(), "line2": "LOS ANGELES", "color": "cyan"},
-        {"line1": f"{w['temp_f']}F/{w['temp_c']}C", "line2": w['desc'][:10].upper(), "color": "cyan"},
+        {"line1": w['temp_line'], "line2": w['desc_upper10'], "color": "cyan"},
         {"line1": f"AQI {a['aqi']}", "line2": a['cat'][:10].upper(), "color": aqi_color},
         {"line1": "METRO", "line2": "ON TIME", "color": "green"},
         {"line1": "CITY HALL", "line2": "OPEN 8-5", "color": "cyan"},
@@ -197,7 +391,7 @@ def general_slides(data, formatter):
     w = data.weather()
     slides = [
         {"line1": data.time_str(), "line2": "CITYARRAY", "color": "green"},
-        {"line1": f"{w['temp_f']}F/{w['temp_c']}C", "line2": w['desc'][:10].upper(), "color": "cyan"},
+        {"line1": w['temp_line'], "line2": w['desc_upper10'], "color": "cyan"},
         {"line1": "ASK ME", "line2": "ANYTHING", "color": "green"},
         {"line1": "NEED HELP?", "line2": "HEY CITY", "color": "green"},
     ]
@@ -223,12 +417,16 @@ class DisplayEngine(threading.Thread):
         super().__init__(daemon=True)
         self.formatter = SignFormatter(CONFIG["sign_ip"])
         self.data = DataService()
+        self.refresher = DataRefresher(self.data)
         self.audio = AudioService()
         self.running = True
         self.slide_idx = 0
+        self.deck_key = None
+        self.slides = []
     
     def run(self):
         """Main display loop"""
+        self.refresher.start()
         while self.running:
             # Check for override message from console
             if STATE["override_message"] and time.time() < STATE["override_until"]:
@@ -248,8 +446,12 @@ class DisplayEngine(threading.Thread):
             # Update formatter languages
             self.formatter.set_languages(STATE["languages"])
             
-            # Generate slides
-            slides = AGENTS[agent]["slides"](self.data, self.formatter)
+            # Rebuild slides only when agent, data or the clock minute changed
+            key = (agent, self.data.rev, time.strftime("%H:%M"))
+            if key != self.deck_key:
+                self.slides = AGENTS[agent]["slides"](self.data, self.formatter)
+                self.deck_key = key
+            slides = self.slides
             
             if not slides:
                 time.sleep(1)
@@ -257,36 +459,39 @@ class DisplayEngine(threading.Thread):
             
             # Get current slide
             slide = slides[self.slide_idx % len(slides)]
+            message = self._slide_message(slide)
             
-            # Display with icon if present
-            icon = slide.get("icon")
-            if icon:
-                self.formatter.sign.icon(icon, slide.get("color", "green"))
-                time.sleep(2)
+            # Translate the next slide while this one is on the sign
+            upcoming = self._slide_message(slides[(self.slide_idx + 1) % len(slides)])
+            if upcoming:
+                self.formatter.prefetch(upcoming)
             
-            # Display content
-            if "line1" in slide and "line2" in slide:
-                # Add direction arrow if specified
-                line2 = slide["line2"]
-                if slide.get("dir") == "right":
-                    line2 = line2[:8] + " >>"
-                elif slide.get("dir") == "left":
-                    line2 = "<< " + line2[:7]
-                
+            # Display content; the icon (if any) is sent with the first language
+            if message:
                 self.formatter.format_and_display(
-                    {"line1": slide["line1"], "line2": line2},
-                    color=slide.get("color", "green")
-                )
-            elif "text" in slide:
-                self.formatter.format_and_display(
-                    {"text": slide["text"]},
-                    color=slide.get("color", "green")
+                    message,
+                    color=slide.get("color", "green"),
+                    icon=slide.get("icon")
                 )
             
             self.slide_idx += 1
             
             # Don't sleep here - formatter handles timing for each language
     
+    def _slide_message(self, slide):
+        """Formatter message for a slide"""
+        if "line1" in slide and "line2" in slide:
+            # Add direction arrow if specified
+            line2 = slide["line2"]
+            if slide.get("dir") == "right":
+                line2 = line2[:8] + " >>"
+            elif slide.get("dir") == "left":
+                line2 = "<< " + line2[:7]
+            return {"line1": slide["line1"], "line2": line2}
+        elif "text" in slide:
+            return {"text": slide["text"]}
+        return None
+    
     def _display_override(self):
         """Display console override message"""
         msg = STATE["override_message"]
@@ -299,29 +504,75 @@ class DisplayEngine(threading.Thread):
     
     def stop(self):
         self.running = False
+        self.refresher.stop()
+        self.audio.close()
+        self.formatter.close()
 
 
 # ============================================================================
 # FLASK API - Dashboard Control Interface
 # ============================================================================
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+if orjson:
+    app.json = OrjsonProvider(app)
+app.json.sort_keys = False  # no key sorting or pretty-printing on the stdlib path
+app.json.compact = True
 display_engine = None
 
+# Serialized GET bodies: key -> (expires, body)
+_response_cache = {}
+
+
+def cached_json(key, ttl, build):
+    """Serve a JSON body from the response cache, rebuilding it after ttl seconds"""
+    now = time.monotonic()
+    hit = _response_cache.get(key)
+    if hit is None or hit[0] < now:
+        hit = (now + ttl, app.json.dumps(build()))
+        _response_cache[key] = hit
+    return app.response_class(hit[1], mimetype="application/json")
+
+
+def invalidate(key):
+    _response_cache.pop(key, None)
+
+
+# One translator for /api/translate rather than one per request
+TRANSLATOR = Translator()
+
+# PHRASES never changes at runtime: serialize it once
+_PHRASES_BODY = app.json.dumps(dict(PHRASES)).encode()
+
+# Status fields fixed at startup
+_STATUS_STATIC = {
+    "sign_ip": CONFIG["sign_ip"],
+    "available_agents": list(AGENTS.keys()),
+    "available_phrases": len(PHRASES),
+}
+
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get current system status"""
-    return jsonify({
+    return cached_json("status", 1, lambda: {
         "agent": STATE["agent"],
         "languages": STATE["languages"],
         "primary_language": STATE["primary_language"],
         "audio_enabled": STATE["audio_enabled"],
         "voice_input_enabled": STATE["voice_input_enabled"],
         "paused": STATE["paused"],
-        "sign_ip": CONFIG["sign_ip"],
-        "available_agents": list(AGENTS.keys()),
-        "available_phrases": len(PHRASES),
+        **_STATUS_STATIC,
     })
 
 
@@ -333,6 +584,7 @@ def set_agent():
     if agent in AGENTS:
         STATE["agent"] = agent
         display_engine.slide_idx = 0  # Reset slides
+        invalidate("status")
         return jsonify({"success": True, "agent": agent})
     return jsonify({"success": False, "error": "Unknown agent"}), 400
 
@@ -345,6 +597,7 @@ def set_languages():
     primary = data.get("primary", "en")
     STATE["languages"] = languages
     STATE["primary_language"] = primary
+    invalidate("status")
     return jsonify({"success": True, "languages": languages, "primary": primary})
 
 
@@ -353,6 +606,7 @@ def set_audio():
     """Enable/disable audio output"""
     data = request.json
     STATE["audio_enabled"] = data.get("enabled", False)
+    invalidate("status")
     return jsonify({"success": True, "audio_enabled": STATE["audio_enabled"]})
 
 
@@ -361,6 +615,9 @@ def set_voice():
     """Enable/disable voice input"""
     data = request.json
     STATE["voice_input_enabled"] = data.get("enabled", False)
+    invalidate("status")
+    if not STATE["voice_input_enabled"]:
+        display_engine.audio.stop_whisper()  # listen() starts it again on demand
     return jsonify({"success": True, "voice_input_enabled": STATE["voice_input_enabled"]})
 
 
@@ -369,6 +626,7 @@ def pause_display():
     """Pause/resume slide cycling"""
     data = request.json
     STATE["paused"] = data.get("paused", False)
+    invalidate("status")
     return jsonify({"success": True, "paused": STATE["paused"]})
 
 
@@ -473,7 +731,7 @@ def direct_sign():
 @app.route('/api/phrases', methods=['GET'])
 def get_phrases():
     """Get phrase dictionary"""
-    return jsonify(PHRASES)
+    return app.response_class(_PHRASES_BODY, mimetype="application/json")
 
 
 @app.route('/api/translate', methods=['POST'])
@@ -483,8 +741,7 @@ def translate():
     text = data.get("text", "")
     target = data.get("language", "es")
     
-    translator = Translator()
-    result = translator.translate(text, target)
+    result = TRANSLATOR.translate(text, target)
     
     return jsonify({"original": text, "translated": result, "language": target})
 
@@ -6,12 +6,34 @@ With Bilingual Support (EN/ES)
 
 import asyncio
 import json
+import os
+import re
+import socket
 import websockets
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
-import time
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime
 
+try:
+    import orjson  # pip install orjson; much faster parse/encode on the Pi
+    
+    def _loads(data):
+        return orjson.loads(data)
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+    
+    def _dumps(obj):
+        return json.dumps(obj)
+
 # Configuration
 DASHBOARD_HOST = "192.168.1.80"
 DASHBOARD_PORT = 8000
@@ -21,6 +43,15 @@ SIGN_ZONE = "Main Stage"
 PIPER_PATH = "/home/eion88/cityarray/piper/piper"
 PIPER_MODEL = "/home/eion88/.local/share/piper/en_US-lessac-medium.onnx"
 OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_BATCH_WINDOW = 0.02  # seconds to collect translations into one prompt
+OLLAMA_BATCH_MAX = 16
+OLLAMA_CACHE_SIZE = 2048  # remembered Ollama translations
+
+# Keep-alive session for the sign and dashboard; one quick retry on connect errors.
+# Two hosts, and the sign writer sends one command at a time. urllib3 already sets TCP_NODELAY.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                                     max_retries=Retry(total=1, backoff_factor=0.1)))
 
 # Display settings
 LANGUAGES = ["en", "es"]
@@ -177,57 +208,160 @@ PHRASES = {
     "HEY CITY": "HEY CITY",
 }
 
+# Reverse index (ES -> EN); the first English key wins for shared translations
+_PHRASES_EN = {}
+for _en, _es in PHRASES.items():
+    _PHRASES_EN.setdefault(_es, _en)
+
+# Punctuation dropped before word-by-word lookup
+_PUNCT = str.maketrans("", "", ".,!?;:")
+
+# Every dictionary phrase, longest first so "FIRST AID" beats "FIRST"
+_PHRASE_RE = re.compile(r"\b(" + "|".join(map(re.escape, sorted(PHRASES, key=len, reverse=True))) + r")\b")
+
+# "3. text" / "3) text" lines in a batched Ollama reply
+_NUMBERED = re.compile(r"^\s*(\d+)[.)]\s*(.*)$")
+
+
+@lru_cache(maxsize=256)
+def _scroll_payload(text, color, direction):
+    """Padded /scroll body; alerts repeat the same text, so reuse it (never mutated)"""
+    return {"text": f"   {text}   ", "color": color, "dir": direction}
+
 
 class Translator:
     """Translates text using dictionary + Ollama fallback"""
     
-    def translate(self, text, target="es"):
+    def __init__(self):
+        self._session = None  # shared aiohttp session, created on first use
+        self._pending = None  # queued (text, target, future) for the batcher
+        self._batcher = None
+        self._batches = set()  # in-flight _ollama_batch tasks (the loop only holds weak refs)
+        self._llm_cache = OrderedDict()  # (text, target) -> translation, LRU order
+    
+    async def _http(self):
+        if self._session is None or self._session.closed:
+            # IPv4 only so "localhost" doesn't try ::1 first; idle Ollama sockets kept 5 min
+            connector = aiohttp.TCPConnector(limit=8, limit_per_host=8, keepalive_timeout=300,
+                                             family=socket.AF_INET)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=10))
+        return self._session
+    
+    async def translate(self, text, target="es"):
         """Translate text to target language"""
-        if target == "en":
+        if not text:
             return text
-        
         upper = text.upper().strip()
         
+        if target == "en":
+            # Spanish dictionary phrases map back; anything else is taken as English
+            return _PHRASES_EN.get(upper, text)
+        
         # Try exact match
         if upper in PHRASES:
             return PHRASES[upper]
         
-        # Try word-by-word for short phrases
-        words = upper.split()
+        # Already a Spanish dictionary phrase
+        if target == "es" and upper in _PHRASES_EN:
+            return text
+        
+        # Try phrase-by-phrase for short text (longest phrase wins)
+        words = upper.translate(_PUNCT).split()
         if len(words) <= 4:
-            translated = []
-            all_found = True
-            for word in words:
-                clean = word.strip(".,!?")
-                if clean in PHRASES:
-                    translated.append(PHRASES[clean])
-                else:
-                    translated.append(word)
-                    if clean.isalpha():
-                        all_found = False
+            clean = " ".join(words)
+            translated = _PHRASE_RE.sub(lambda m: PHRASES[m.group(1)], clean)
+            all_found = not any(w.isalpha() for w in _PHRASE_RE.sub(" ", clean).split())
             if all_found or len(words) <= 2:
-                return " ".join(translated)
+                return translated
         
         # Ollama fallback for unknown text
-        return self._ollama_translate(text, target)
+        return await self._ollama_translate(text, target)
+    
+    async def _ollama_translate(self, text, target):
+        """Use Ollama for translation (batched with concurrent callers)"""
+        key = (text, target)
+        if key in self._llm_cache:
+            self._llm_cache.move_to_end(key)
+            return self._llm_cache[key]
+        
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((text, target, future))
+        result = await future
+        if not result:
+            return text  # failed: don't cache, retry next time
+        
+        self._llm_cache[key] = result
+        if len(self._llm_cache) > OLLAMA_CACHE_SIZE:
+            self._llm_cache.popitem(last=False)
+        return result
+    
+    async def _batch_loop(self):
+        """Collect requests for OLLAMA_BATCH_WINDOW, then send one prompt per language"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            deadline = loop.time() + OLLAMA_BATCH_WINDOW
+            while len(batch) < OLLAMA_BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            by_target = {}
+            for text, target, future in batch:
+                by_target.setdefault(target, []).append((text, future))
+            for target, items in by_target.items():
+                task = asyncio.create_task(self._ollama_batch(target, items))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
     
-    def _ollama_translate(self, text, target):
-        """Use Ollama for translation"""
+    async def _ollama_batch(self, target, items):
+        """One Ollama call for every queued text in a language; resolves each future"""
         lang_name = {"es": "Spanish", "vi": "Vietnamese", "zh": "Chinese"}.get(target, target)
+        texts = list(dict.fromkeys(text for text, _ in items))
+        results = {}
         try:
-            r = requests.post(OLLAMA_URL, json={
-                "model": "llama3.2:3b",
-                "prompt": f"Translate to {lang_name}. Reply ONLY with the translation, no explanation: {text}",
-                "stream": False
-            }, timeout=10)
-            result = r.json().get("response", "").strip()
-            # Clean up
-            result = result.strip('"\'').split('\n')[0]
-            print(f"🌐 Translated: '{text}' → '{result}'")
-            return result if result else text
+            if len(texts) == 1:
+                prompt = f"Translate to {lang_name}. Reply ONLY with the translation, no explanation: {texts[0]}"
+                reply = await self._ollama(prompt)
+                # Clean up
+                results[texts[0]] = reply.strip('"\'').split('\n')[0]
+            else:
+                # One line per item: embedded newlines would throw off the numbering
+                numbered = "\n".join(f"{i}. {' '.join(t.split())}" for i, t in enumerate(texts, 1))
+                prompt = (f"Translate each line to {lang_name}, one per line, keeping the numbers. "
+                          f"Reply ONLY with the translations:\n{numbered}")
+                # Generation time grows with the number of lines
+                reply = await self._ollama(prompt, timeout=10 + 2 * len(texts))
+                for line in reply.split("\n"):
+                    m = _NUMBERED.match(line)
+                    if m and 1 <= int(m.group(1)) <= len(texts):
+                        results[texts[int(m.group(1)) - 1]] = m.group(2).strip().strip('"\'')
+            for text in texts:
+                print(f"🌐 Translated: '{text}' → '{results.get(text)}'")
         except Exception as e:
             print(f"⚠️ Translation error: {e}")
-            return text
+        finally:
+            # Every caller gets an answer, even if this task is cancelled (None = untranslated)
+            for text, future in items:
+                if not future.done():
+                    future.set_result(results.get(text))
+    
+    async def _ollama(self, prompt, timeout=10):
+        session = await self._http()
+        async with session.post(OLLAMA_URL, json={
+            "model": "llama3.2:3b",
+            "prompt": prompt,
+            "stream": False
+        }, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            return _loads(await r.read()).get("response", "").strip()
 
 
 class SignClient:
@@ -237,90 +371,111 @@ class SignClient:
         self.connected = False
         self.translator = Translator()
         self.bilingual_enabled = True
+        self._piper = None  # long-lived TTS pipeline, started on first speak
+        self._aplay = None
+        self._display_queue = asyncio.PriorityQueue()  # (-priority, seq, message)
+        self._display_seq = 0  # keeps equal priorities in arrival order
+        self._current_display = None
+        self._current_priority = 0
+        self._current_entry = None  # queue entry being rendered, for requeue on preemption
+        self._display_task = None
+        self._writer_task = None
+        self._sign_queue = asyncio.Queue()  # (endpoint, data) for the sign writer
         
-    def send_to_sign(self, endpoint, data):
+    async def send_to_sign(self, endpoint, data):
         """Send command to physical LED sign"""
+        return await asyncio.to_thread(self._post_sign, endpoint, data)
+    
+    def _post_sign(self, endpoint, data):
         try:
             url = f"http://{SIGN_IP}{endpoint}"
-            resp = requests.post(url, json=data, timeout=2)
+            resp = SESSION.post(url, json=data, timeout=2)
             return resp.ok
         except Exception as e:
             print(f"❌ Sign error: {e}")
             return False
     
-    def sign_display(self, text, color="green"):
-        self.send_to_sign("/display", {"text": text[:10], "color": color})
+    async def _queue_sign(self, endpoint, data):
+        """Hand a screen command to the sign writer"""
+        await self._sign_queue.put((endpoint, data))
+    
+    async def _sign_writer(self):
+        """Send queued screen commands, skipping any already replaced by a newer one"""
+        while True:
+            command = await self._sign_queue.get()
+            # Each command redraws the whole screen, so only the newest is visible
+            while not self._sign_queue.empty():
+                command = self._sign_queue.get_nowait()
+            await self.send_to_sign(*command)
+    
+    async def sign_display(self, text, color="green"):
+        await self._queue_sign("/display", {"text": text[:10], "color": color})
+    
+    async def sign_twoline(self, line1, line2, color="green"):
+        await self._queue_sign("/twoline", {"line1": line1[:10], "line2": line2[:10], "color": color})
     
-    def sign_twoline(self, line1, line2, color="green"):
-        self.send_to_sign("/twoline", {"line1": line1[:10], "line2": line2[:10], "color": color})
+    async def sign_big(self, text, color="green"):
+        await self._queue_sign("/big", {"text": text[:5], "color": color})
     
-    def sign_big(self, text, color="green"):
-        self.send_to_sign("/big", {"text": text[:5], "color": color})
+    async def sign_scroll(self, text, color="cyan", direction="left"):
+        await self._queue_sign("/scroll", _scroll_payload(text, color, direction))
     
-    def sign_scroll(self, text, color="cyan", direction="left"):
-        self.send_to_sign("/scroll", {"text": f"   {text}   ", "color": color, "dir": direction})
+    async def sign_flash(self, text, color="red"):
+        await self._queue_sign("/flash", {"text": text[:10], "color": color})
     
-    def sign_flash(self, text, color="red"):
-        self.send_to_sign("/flash", {"text": text[:10], "color": color})
+    async def sign_icon(self, icon, color="green"):
+        await self._queue_sign("/icon", {"icon": icon, "color": color})
     
-    def sign_icon(self, icon, color="green"):
-        self.send_to_sign("/icon", {"icon": icon, "color": color})
+    async def sign_clear(self):
+        await self._queue_sign("/display", {"text": "READY", "color": "green"})
     
-    def sign_clear(self):
-        self.send_to_sign("/display", {"text": "READY", "color": "green"})
+    async def _translate_all(self, text):
+        """Text in every display language, translated concurrently"""
+        if not text:
+            return [text] * len(LANGUAGES)
+        targets = [lang for lang in LANGUAGES if lang != "en"]
+        results = await asyncio.gather(*(self.translator.translate(text, lang) for lang in targets))
+        translated = dict(zip(targets, results))
+        return [translated.get(lang, text) for lang in LANGUAGES]
     
-    def display_bilingual(self, line1, line2, color="cyan", scroll_if_long=True):
+    async def display_bilingual(self, line1, line2, color="cyan", scroll_if_long=True):
         """Display message in English then Spanish"""
-        for lang in LANGUAGES:
-            if lang == "en":
-                t1, t2 = line1, line2
-            else:
-                t1 = self.translator.translate(line1, lang)
-                t2 = self.translator.translate(line2, lang) if line2 else ""
-            
+        # Both lines in all languages at once; Ollama misses share one batch
+        lines1, lines2 = await asyncio.gather(self._translate_all(line1), self._translate_all(line2))
+        for lang, t1, t2 in zip(LANGUAGES, lines1, lines2):
             print(f"📺 [{lang.upper()}] {t1} / {t2}")
             
             # Check if needs scroll
             if len(t1) > 10 or len(t2) > 10:
                 if scroll_if_long:
                     combined = f"{t1} - {t2}" if t2 else t1
-                    self.sign_scroll(combined, color)
+                    await self.sign_scroll(combined, color)
                 else:
                     # Truncate
-                    self.sign_twoline(t1[:10], t2[:10], color)
+                    await self.sign_twoline(t1[:10], t2[:10], color)
             else:
                 if t2:
-                    self.sign_twoline(t1, t2, color)
+                    await self.sign_twoline(t1, t2, color)
                 elif len(t1) <= 5:
-                    self.sign_big(t1, color)
+                    await self.sign_big(t1, color)
                 else:
-                    self.sign_display(t1, color)
+                    await self.sign_display(t1, color)
             
-            time.sleep(SLIDE_DURATION)
+            await asyncio.sleep(SLIDE_DURATION)
     
-    def display_bilingual_scroll(self, text, color="cyan"):
+    async def display_bilingual_scroll(self, text, color="cyan"):
         """Scroll message in English then Spanish"""
-        for lang in LANGUAGES:
-            if lang == "en":
-                t = text
-            else:
-                t = self.translator.translate(text, lang)
-            
+        for lang, t in zip(LANGUAGES, await self._translate_all(text)):
             print(f"📜 [{lang.upper()}] {t}")
-            self.sign_scroll(t, color)
-            time.sleep(SLIDE_DURATION + 3)  # Extra time for scroll
+            await self.sign_scroll(t, color)
+            await asyncio.sleep(SLIDE_DURATION + 3)  # Extra time for scroll
     
-    def display_bilingual_flash(self, text, color="red"):
+    async def display_bilingual_flash(self, text, color="red"):
         """Flash message in English then Spanish"""
-        for lang in LANGUAGES:
-            if lang == "en":
-                t = text
-            else:
-                t = self.translator.translate(text, lang)
-            
+        for lang, t in zip(LANGUAGES, await self._translate_all(text)):
             print(f"⚡ [{lang.upper()}] {t}")
-            self.sign_flash(t[:10], color)
-            time.sleep(SLIDE_DURATION)
+            await self.sign_flash(t[:10], color)
+            await asyncio.sleep(SLIDE_DURATION)
         
     async def register(self):
         """Register this sign with the dashboard"""
@@ -333,9 +488,10 @@ class SignClient:
             "has_microphone": True
         }
         try:
-            resp = requests.post(url, json=data, params={"zone": SIGN_ZONE})
+            resp = await asyncio.to_thread(SESSION.post, url, json=data,
+                                           params={"zone": SIGN_ZONE}, timeout=5)
             if resp.ok:
-                result = resp.json()
+                result = _loads(resp.content)
                 self.sign_id = result["id"]
                 print(f"✅ Registered as: {self.sign_id}")
                 return True
@@ -354,7 +510,9 @@ class SignClient:
         uri = f"ws://{DASHBOARD_HOST}:{DASHBOARD_PORT}/ws/sign/{self.sign_id}"
         print(f"🔌 Connecting to {uri}")
         
-        self.sign_twoline("CONNECTING", "DASHBOARD", "cyan")
+        self._writer_task = asyncio.create_task(self._sign_writer())
+        self._display_task = asyncio.create_task(self._display_loop())
+        await self.sign_twoline("CONNECTING", "DASHBOARD", "cyan")
         
         while True:
             try:
@@ -362,19 +520,19 @@ class SignClient:
                     self.ws = ws
                     self.connected = True
                     print("✅ Connected to dashboard!")
-                    self.sign_twoline("CONNECTED", "READY", "green")
+                    await self.sign_twoline("CONNECTED", "READY", "green")
                     
                     heartbeat_task = asyncio.create_task(self.heartbeat())
                     
                     async for message in ws:
-                        await self.handle_message(json.loads(message))
+                        await self.handle_message(_loads(message))
                     
             except websockets.exceptions.ConnectionClosed:
                 print("🔌 Connection closed, reconnecting...")
-                self.sign_twoline("RECONNECT", "WAIT...", "amber")
+                await self.sign_twoline("RECONNECT", "WAIT...", "amber")
             except Exception as e:
                 print(f"❌ Connection error: {e}")
-                self.sign_twoline("ERROR", "RETRY...", "red")
+                await self.sign_twoline("ERROR", "RETRY...", "red")
             
             self.connected = False
             await asyncio.sleep(5)
@@ -383,7 +541,7 @@ class SignClient:
         """Send periodic heartbeat"""
         while self.connected:
             try:
-                await self.ws.send(json.dumps({
+                await self.ws.send(_dumps({
                     "type": "heartbeat",
                     "data": {
                         "battery": 100,
@@ -401,40 +559,92 @@ class SignClient:
         msg_type = data.get("type")
         print(f"📨 Received: {msg_type}")
         
+        if msg_type == "set_bilingual":
+            self.bilingual_enabled = data.get("enabled", True)
+            print(f"🌐 Bilingual: {self.bilingual_enabled}")
+        elif msg_type == "clear_message":
+            # Drop anything queued and stop what is showing
+            while not self._display_queue.empty():
+                self._display_queue.get_nowait()
+            if self._current_display:
+                self._current_display.cancel()
+            await self.sign_clear()
+        else:
+            self._enqueue(data)
+    
+    def _enqueue(self, data):
+        """Queue a display command; preempt the current one if this outranks it"""
+        if data.get("type") == "new_message":
+            priority = data.get("data", {}).get("priority", 0)
+        elif data.get("type") == "flash":
+            priority = 90
+        else:
+            priority = 0
+        self._display_seq += 1
+        self._display_queue.put_nowait((-priority, self._display_seq, data))
+        if self._current_display and not self._current_display.done() \
+                and priority > self._current_priority:
+            print(f"⏭️ Preempting priority {self._current_priority} for {priority}")
+            if self._current_entry[2].get("type") == "new_message":
+                # Not shown (or acked) yet: run it again once the higher one is done
+                self._display_queue.put_nowait(self._current_entry)
+            self._current_display.cancel()
+    
+    async def _display_loop(self):
+        """Show queued commands one at a time, highest priority first"""
+        while True:
+            entry = await self._display_queue.get()
+            neg_priority, _, data = entry
+            self._current_priority = -neg_priority
+            self._current_entry = entry
+            task = self._current_display = asyncio.create_task(self._render(data))
+            await asyncio.wait({task})
+            self._current_display = None
+            self._current_entry = None
+            if not task.cancelled() and task.exception():
+                print(f"❌ Display error ({data.get('type')}): {task.exception()}")
+    
+    async def _render(self, data):
+        """Run one display command on the sign"""
+        try:
+            await self._dispatch(data)
+        except asyncio.CancelledError:
+            # Preempted or cleared mid-scroll/flash: don't leave it half drawn
+            await self.sign_clear()
+            raise
+    
+    async def _dispatch(self, data):
+        msg_type = data.get("type")
+        
         if msg_type == "new_message":
             await self.display_message(data.get("data", {}))
-        elif msg_type == "clear_message":
-            self.sign_clear()
         elif msg_type == "display":
             d = data.get("data", {})
             if self.bilingual_enabled:
-                self.display_bilingual(d.get("text", ""), "", d.get("color", "green"))
+                await self.display_bilingual(d.get("text", ""), "", d.get("color", "green"))
             else:
-                self.sign_display(d.get("text", ""), d.get("color", "green"))
+                await self.sign_display(d.get("text", ""), d.get("color", "green"))
         elif msg_type == "twoline":
             d = data.get("data", {})
             if self.bilingual_enabled:
-                self.display_bilingual(d.get("line1", ""), d.get("line2", ""), d.get("color", "green"))
+                await self.display_bilingual(d.get("line1", ""), d.get("line2", ""), d.get("color", "green"))
             else:
-                self.sign_twoline(d.get("line1", ""), d.get("line2", ""), d.get("color", "green"))
+                await self.sign_twoline(d.get("line1", ""), d.get("line2", ""), d.get("color", "green"))
         elif msg_type == "scroll":
             d = data.get("data", {})
             if self.bilingual_enabled:
-                self.display_bilingual_scroll(d.get("text", ""), d.get("color", "cyan"))
+                await self.display_bilingual_scroll(d.get("text", ""), d.get("color", "cyan"))
             else:
-                self.sign_scroll(d.get("text", ""), d.get("color", "cyan"), d.get("dir", "left"))
+                await self.sign_scroll(d.get("text", ""), d.get("color", "cyan"), d.get("dir", "left"))
         elif msg_type == "flash":
             d = data.get("data", {})
             if self.bilingual_enabled:
-                self.display_bilingual_flash(d.get("text", "ALERT"), d.get("color", "red"))
+                await self.display_bilingual_flash(d.get("text", "ALERT"), d.get("color", "red"))
             else:
-                self.sign_flash(d.get("text", "ALERT"), d.get("color", "red"))
+                await self.sign_flash(d.get("text", "ALERT"), d.get("color", "red"))
         elif msg_type == "icon":
             d = data.get("data", {})
-            self.sign_icon(d.get("icon", "check"), d.get("color", "green"))
-        elif msg_type == "set_bilingual":
-            self.bilingual_enabled = data.get("enabled", True)
-            print(f"🌐 Bilingual: {self.bilingual_enabled}")
+            await self.sign_icon(d.get("icon", "check"), d.get("color", "green"))
     
     async def display_message(self, message):
         """Display message on LED with bilingual support"""
@@ -446,19 +656,19 @@ class SignClient:
         
         if priority >= 90:
             # Emergency - flash bilingual
-            self.display_bilingual_flash(content[:10], "red")
+            await self.display_bilingual_flash(content[:10], "red")
         elif priority >= 70:
             # Alert - scroll bilingual
-            self.display_bilingual_scroll(content, "amber")
+            await self.display_bilingual_scroll(content, "amber")
         elif len(content) <= 21 and " " in content:
             # Try two lines
             words = content.split()
             mid = len(words) // 2 or 1
             line1 = " ".join(words[:mid])
             line2 = " ".join(words[mid:])
-            self.display_bilingual(line1, line2, color)
+            await self.display_bilingual(line1, line2, color)
         else:
-            self.display_bilingual(content, "", color)
+            await self.display_bilingual(content, "", color)
         
         # TTS if audio enabled
         if message.get("audio_enabled"):
@@ -466,26 +676,59 @@ class SignClient:
         
         # Acknowledge
         if self.ws:
-            await self.ws.send(json.dumps({
+            await self.ws.send(_dumps({
                 "type": "ack",
                 "message_id": message.get("id")
             }))
     
-    async def speak(self, text):
-        """Text-to-speech using Piper"""
+    async def _start_tts(self):
+        """Start piper once, streaming its raw audio straight into aplay"""
+        read_fd, write_fd = os.pipe()
         try:
-            process = subprocess.Popen(
-                [PIPER_PATH, "--model", PIPER_MODEL, "--output-raw"],
-                stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            self._aplay = await asyncio.create_subprocess_exec(
+                "aplay", "-D", "plughw:2,0", "-r", "22050", "-f", "S16_LE", "-c", "1",
+                stdin=read_fd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
             )
-            audio, _ = process.communicate(text.encode())
-            subprocess.run(
-                ["aplay", "-D", "plughw:2,0", "-r", "22050", "-f", "S16_LE", "-c", "1"],
-                input=audio, capture_output=True
+            self._piper = await asyncio.create_subprocess_exec(
+                PIPER_PATH, "--model", PIPER_MODEL, "--output-raw",
+                stdin=subprocess.PIPE, stdout=write_fd, stderr=subprocess.DEVNULL
             )
+        finally:
+            os.close(read_fd)  # the children hold their own copies
+            os.close(write_fd)
+    
+    def _tts_alive(self):
+        return (self._piper is not None and self._piper.returncode is None
+                and self._aplay.returncode is None)
+    
+    async def speak(self, text):
+        """Text-to-speech using Piper"""
+        try:
+            if not self._tts_alive():
+                await self._stop_tts()
+                await self._start_tts()
+            # piper synthesizes one utterance per input line
+            self._piper.stdin.write(" ".join(text.split()).encode() + b"\n")
+            await self._piper.stdin.drain()
             print(f"🔊 Spoke: {text}")
         except Exception as e:
             print(f"⚠️ TTS error: {e}")
+            await self._stop_tts()
+    
+    async def _stop_tts(self):
+        """Stop and reap the piper/aplay pipeline"""
+        for proc in (self._piper, self._aplay):
+            if proc is None:
+                continue
+            if proc.returncode is None:
+                proc.terminate()
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+        self._piper = None
+        self._aplay = None
 
 
 async def main():
@@ -503,16 +746,16 @@ async def main():
     
     # Test sign connection
     print("Testing sign connection...")
-    if client.send_to_sign("/display", {"text": "STARTING", "color": "cyan"}):
+    if await client.send_to_sign("/display", {"text": "STARTING", "color": "cyan"}):
         print("✅ Sign connected!")
     else:
         print("⚠️ Sign not responding")
     
     # Test translation
     print("\nTesting translation...")
-    print(f"  WATER → {client.translator.translate('WATER', 'es')}")
-    print(f"  FIRST AID → {client.translator.translate('FIRST AID', 'es')}")
-    print(f"  EVACUATE → {client.translator.translate('EVACUATE', 'es')}")
+    print(f"  WATER → {await client.translator.translate('WATER', 'es')}")
+    print(f"  FIRST AID → {await client.translator.translate('FIRST AID', 'es')}")
+    print(f"  EVACUATE → {await client.translator.translate('EVACUATE', 'es')}")
     print()
     
     await client.connect()
@@ -6,16 +6,29 @@ CITYARRAY Sign Formatter
 - Handles translation with dictionary + LLM fallback
 """
 import requests
+from requests.adapters import HTTPAdapter
+import json
+import sys
 import time
 import re
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 CONFIG = {
     "sign_ip": "192.168.1.239",
     "slide_duration": 5,
     "languages": ["en", "es"],  # Base languages
     "primary_language": "en",
+    "icon_duration": 2,  # seconds an icon leads its text
 }
 
+OLLAMA_URL = "http://localhost:11434/api/generate"
+
+# Keep-alive session so Ollama calls reuse one local connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 # ============================================================================
 # EXTENDED PHRASE DICTIONARY (~100 phrases)
 # ============================================================================
@@ -161,6 +174,25 @@ PHRASES = {
     "HEY CITY": {"es": "HEY CITY"},
 }
 
+# Read-only at runtime; interned so table keys and lookups share one string object
+PHRASES = MappingProxyType({
+    sys.intern(phrase): {sys.intern(lang): sys.intern(text) for lang, text in translations.items()}
+    for phrase, translations in PHRASES.items()
+})
+
+# Flat per-language tables keyed by casefolded phrase: LANG_TABLES["es"]["water"] == "AGUA"
+LANG_TABLES = {}
+for _phrase, _translations in PHRASES.items():
+    for _lang, _text in _translations.items():
+        LANG_TABLES.setdefault(_lang, {})[sys.intern(_phrase.casefold())] = _text
+
+# Every language the dictionary covers, plus English
+_ALL_LANGS = tuple(sorted({"en", *LANG_TABLES}))
+
+# Cheap pre-checks before an exact-match lookup
+_MAX_PHRASE_LEN = max(len(p.casefold()) for p in PHRASES)
+_PHRASE_FIRST_CHARS = frozenset(p.casefold()[0] for p in PHRASES)
+
 # ============================================================================
 # SIGN COMMUNICATION
 # ============================================================================
@@ -168,13 +200,20 @@ PHRASES = {
 class Sign:
     def __init__(self, ip):
         self.url = f"http://{ip}"
+        self.slide_supported = True  # cleared if the sign firmware has no /slide
+        self.session = requests.Session()  # keep-alive connection to the sign
+        # One sender thread: commands reach the sign in order without blocking callers
+        self.sender = ThreadPoolExecutor(max_workers=1)
     
     def _post(self, endpoint, data):
+        """Queue a command for the sender thread"""
+        return self.sender.submit(self._send, endpoint, data)
+    
+    def _send(self, endpoint, data):
         try:
-            requests.post(f"{self.url}{endpoint}", json=data, timeout=2)
-            return True
+            return self.session.post(f"{self.url}{endpoint}", json=data, timeout=2)
         except:
-            return False
+            return None
     
     def display(self, text, color="green"):
         """Single line, max 10 chars"""
@@ -203,45 +242,127 @@ class Sign:
     def flash(self, text, color="red"):
         """Flashing alert"""
         self._post("/flash", {"text": text[:10], "color": color})
+    
+    def slide(self, icon, l1, l2, color="green", dwell=2):
+        """Icon then two lines in one request; the sign times the transition"""
+        return self.sender.submit(self._send_slide, icon, l1, l2, color, dwell)
+    
+    def _send_slide(self, icon, l1, l2, color, dwell):
+        if self.slide_supported:
+            try:
+                resp = self.session.post(f"{self.url}/slide", json={
+                    "icon": icon, "line1": l1[:10], "line2": l2[:10],
+                    "color": color, "dwell": dwell
+                }, timeout=2)
+            except requests.exceptions.ReadTimeout:
+                return  # the sign has the request, it was just slow to answer
+            except requests.exceptions.RequestException:
+                resp = None  # never reached the sign
+            if resp is not None and 200 <= resp.status_code < 300:
+                return
+            if resp is not None and resp.status_code in (404, 405, 501):
+                self.slide_supported = False  # sign has no /slide; stop asking
+        # /slide not delivered or rejected: send the two steps ourselves
+        self._send("/icon", {"icon": icon, "color": color})
+        time.sleep(dwell)
+        self._send("/twoline", {"line1": l1[:10], "line2": l2[:10], "color": color})
 
 
 # ============================================================================
 # TRANSLATOR
 # ============================================================================
 
+LANG_NAMES = {"es": "Spanish", "vi": "Vietnamese", "zh": "Chinese"}
+_SPANISH_MARKS = frozenset("áéíóúüñ¿¡")
+
+
+def _already_in(text, lang):
+    """Spanish diacritics/punctuation: text is already Spanish, don't ask the LLM"""
+    return lang == "es" and not _SPANISH_MARKS.isdisjoint(text.casefold())
+
+
+class TranslationFailed(Exception):
+    """LLM translation unavailable; raised so the failure isn't memoized"""
+
+
 class Translator:
     def __init__(self):
         self.phrases = PHRASES
+        # Demo loops and repeated alerts ask for the same (text, lang) over and over
+        self._cached = lru_cache(maxsize=2048)(self._translate_uncached)
+        self._cached_multi = lru_cache(maxsize=512)(self._llm_translate_multi)
     
     def translate(self, text, target_lang="es"):
         """Translate text, using dictionary first, LLM fallback"""
         if target_lang == "en":
             return text
-        
-        # Try exact match
-        upper = text.upper()
-        if upper in self.phrases and target_lang in self.phrases[upper]:
-            return self.phrases[upper][target_lang]
-        
-        # Try word-by-word for short phrases
-        words = upper.split()
-        if len(words) <= 3:
-            translated = []
-            for word in words:
-                if word in self.phrases and target_lang in self.phrases[word]:
-                    translated.append(self.phrases[word][target_lang])
+        try:
+            return self._cached(text, target_lang)
+        except TranslationFailed:
+            return text  # Return original if translation fails
+    
+    def translate_multi(self, text, langs):
+        """Translate text into every language in langs with at most one LLM call"""
+        result = {}
+        missing = []
+        for lang in langs:
+            if lang == "en":
+                result[lang] = text
+            else:
+                hit = self._dictionary(text, lang)
+                if hit is not None:
+                    result[lang] = hit
+                elif _already_in(text, lang):
+                    result[lang] = text
                 else:
-                    translated.append(word)  # Keep original if not found
-            return " ".join(translated)
+                    missing.append(lang)
+        
+        if len(missing) == 1:
+            result[missing[0]] = self.translate(text, missing[0])
+        elif missing:
+            try:
+                result.update(self._cached_multi(text, tuple(missing)))
+            except TranslationFailed:
+                pass
+            # Languages the JSON reply left out go through the single-language path,
+            # which doesn't memoize failures, so they get retried next time
+            for lang in missing:
+                if lang not in result:
+                    result[lang] = self.translate(text, lang)
+        return result
+    
+    def _translate_uncached(self, text, target_lang):
+        hit = self._dictionary(text, target_lang)
+        if hit is not None:
+            return hit
         
         # LLM fallback for longer/unknown text
         return self._llm_translate(text, target_lang)
     
+    def _dictionary(self, text, target_lang):
+        """Dictionary translation, or None when the LLM is needed"""
+        table = LANG_TABLES.get(target_lang, {})
+        
+        # Try exact match (skipped when no phrase could match)
+        folded = text.casefold()
+        if len(folded) <= _MAX_PHRASE_LEN and folded[:1] in _PHRASE_FIRST_CHARS:
+            hit = table.get(folded)
+            if hit:
+                return hit
+        
+        # Try word-by-word for short phrases (keep original, upper-cased, if not found)
+        words = folded.split()
+        if len(words) <= 3:
+            return " ".join([table.get(word) or word.upper() for word in words])
+        return None
+    
     def _llm_translate(self, text, target_lang):
         """Use Ollama for translation"""
-        lang_name = {"es": "Spanish", "vi": "Vietnamese", "zh": "Chinese"}.get(target_lang, target_lang)
+        if _already_in(text, target_lang):
+            return text
+        lang_name = LANG_NAMES.get(target_lang, target_lang)
         try:
-            r = requests.post("http://localhost:11434/api/generate", json={
+            r = SESSION.post(OLLAMA_URL, json={
                 "model": "llama3.2:3b",
                 "prompt": f"Translate to {lang_name}. Only respond with the translation, nothing else: {text}",
                 "stream": False
@@ -249,16 +370,34 @@ class Translator:
             result = r.json().get("response", "").strip()
             # Clean up any quotes or extra text
             result = result.strip('"\'')
-            return result if result else text
         except:
-            return text  # Return original if translation fails
+            result = None
+        if not result:
+            raise TranslationFailed(text)
+        return result
+    
+    def _llm_translate_multi(self, text, langs):
+        """One Ollama call returning {lang: translation} for several languages"""
+        names = ", ".join(LANG_NAMES.get(lang, lang) for lang in langs)
+        keys = ", ".join(f'"{lang}": "..."' for lang in langs)
+        try:
+            r = SESSION.post(OLLAMA_URL, json={
+                "model": "llama3.2:3b",
+                "prompt": f"Translate to {names}. Respond only with JSON {{{keys}}}: {text}",
+                "format": "json",
+                "stream": False
+            }, timeout=15)
+            reply = json.loads(r.json().get("response", ""))
+            result = {lang: str(reply[lang]).strip().strip('"\'') for lang in langs if reply.get(lang)}
+        except:
+            result = None
+        if not result:
+            raise TranslationFailed(text)
+        return result
     
     def get_languages(self):
         """Get available languages from dictionary"""
-        langs = set(["en"])
-        for phrase in self.phrases.values():
-            langs.update(phrase.keys())
-        return sorted(list(langs))
+        return list(_ALL_LANGS)
 
 
 # ============================================================================
@@ -272,6 +411,30 @@ class SignFormatter:
         self.languages = CONFIG["languages"]
         self.primary = CONFIG["primary_language"]
         self.slide_duration = CONFIG["slide_duration"]
+        # Translates upcoming slides in the background while the current one shows
+        self.prefetcher = ThreadPoolExecutor(max_workers=1)
+        self._prefetching = None  # at most one prefetch queued or running
+    
+    def prefetch(self, message):
+        """Warm the translation cache for a message that will be shown next"""
+        if self._prefetching is not None and not self._prefetching.done():
+            return  # still working (e.g. Ollama slow or down); don't pile up behind it
+        texts = [message[k] for k in ("line1", "line2", "text") if message.get(k)]
+        texts.extend(message.get("items", []))
+        languages = [lang for lang in self.languages if lang != "en"]
+        # Dictionary hits are instant anyway; only LLM-bound text is worth warming
+        texts = [text for text in texts
+                 if any(self.translator._dictionary(text, lang) is None for lang in languages)]
+        if texts:
+            self._prefetching = self.prefetcher.submit(self._prefetch, texts, languages)
+    
+    def _prefetch(self, texts, languages):
+        for text in texts:
+            self.translator.translate_multi(text, languages)
+    
+    def close(self):
+        """Stop background work"""
+        self.prefetcher.shutdown(wait=False, cancel_futures=True)
     
     def format_and_display(self, message, color="green", priority="normal", icon=None):
         """
@@ -293,90 +456,121 @@ class SignFormatter:
     def _display_emergency(self, message, color="red"):
         """Flash in all languages"""
         text = message.get("text", message.get("line1", "EMERGENCY"))
+        translations = self.translator.translate_multi(text, self.languages)
         for lang in self.languages:
-            translated = self.translator.translate(text, lang)
-            # Emergency always flashes
-            if len(translated) <= 10:
-                self.sign.flash(translated, color)
-            else:
-                self.sign.flash(translated[:10], color)
-            time.sleep(self.slide_duration)
+            start = time.monotonic()
+            translated = translations[lang]
+            # Emergency always flashes (Sign.flash cuts to 10 chars)
+            self.sign.flash(translated, color)
+            self.dwell(start, self.slide_duration)
     
     def _display_alert(self, message, color="amber"):
         """Scroll alert in all languages"""
         text = message.get("text", message.get("line1", "ALERT"))
+        translations = self.translator.translate_multi(text, self.languages)
         for lang in self.languages:
-            translated = self.translator.translate(text, lang)
+            start = time.monotonic()
+            translated = translations[lang]
             self.sign.scroll_h(f"   {translated}   ", color)
-            time.sleep(self.slide_duration)
+            self.dwell(start, self.slide_duration)
     
     def _display_normal(self, message, color, icon=None):
         """Display normal message with optimal formatting per language"""
         
+        # Two-line messages send the icon together with the first language
+        if "line1" in message and "line2" in message:
+            self._display_twoline(message["line1"], message["line2"], color, icon)
+            return
+        
         # Show icon first if provided
         if icon:
+            start = time.monotonic()
             self.sign.icon(icon, color)
-            time.sleep(2)
+            self.dwell(start, CONFIG["icon_duration"])
         
-        # Handle two-line vs single-line
-        if "line1" in message and "line2" in message:
-            self._display_twoline(message["line1"], message["line2"], color)
-        elif "text" in message:
+        if "text" in message:
             self._display_single(message["text"], color)
         elif "items" in message:
             self._display_list(message["items"], color)
     
-    def _display_twoline(self, line1, line2, color):
-        """Display two lines in all languages"""
+    def _display_twoline(self, line1, line2, color, icon=None):
+        """Display two lines in all languages, optionally led by an icon"""
+        lines1 = self.translator.translate_multi(line1, self.languages)
+        lines2 = self.translator.translate_multi(line2, self.languages)
         for lang in self.languages:
-            t1 = self.translator.translate(line1, lang)
-            t2 = self.translator.translate(line2, lang)
+            start = time.monotonic()
+            hold = self.slide_duration
+            t1 = lines1[lang]
+            t2 = lines2[lang]
+            fits = len(t1) <= 10 and len(t2) <= 10
             
-            # Check lengths
-            if len(t1) <= 10 and len(t2) <= 10:
-                # Fits in twoline
-                self.sign.twoline(t1, t2, color)
-            elif len(t1) <= 10:
-                # Line 1 fits, scroll line 2
-                self.sign.display(t1, color)
-                time.sleep(2)
-                self.sign.scroll_h(f"   {t2}   ", color)
+            if icon and fits:
+                # Icon and text in one request; the sign times the transition
+                self.sign.slide(icon, t1, t2, color, CONFIG["icon_duration"])
+                hold += CONFIG["icon_duration"]
             else:
-                # Both need scroll
-                self.sign.scroll_h(f"   {t1} - {t2}   ", color)
+                if icon:
+                    self.sign.icon(icon, color)
+                    self.dwell(start, CONFIG["icon_duration"])
+                    start = time.monotonic()
+                
+                # Check lengths
+                if fits:
+                    # Fits in twoline
+                    self.sign.twoline(t1, t2, color)
+                elif len(t1) <= 10:
+                    # Line 1 fits, scroll line 2
+                    self.sign.display(t1, color)
+                    self.dwell(start, 2)
+                    self.sign.scroll_h(f"   {t2}   ", color)
+                else:
+                    # Both need scroll
+                    self.sign.scroll_h(f"   {t1} - {t2}   ", color)
             
-            time.sleep(self.slide_duration)
+            icon = None  # icon only leads the first language
+            self.dwell(start, hold)
     
     def _display_single(self, text, color):
         """Display single text in all languages"""
+        translations = self.translator.translate_multi(text, self.languages)
         for lang in self.languages:
-            translated = self.translator.translate(text, lang)
+            start = time.monotonic()
+            translated = translations[lang]
+            size = len(translated)
             
-            if len(translated) <= 5:
+            if size <= 5:
                 self.sign.big(translated, color)
-            elif len(translated) <= 10:
+            elif size <= 10:
                 self.sign.display(translated, color)
             else:
                 self.sign.scroll_h(f"   {translated}   ", color)
             
-            time.sleep(self.slide_duration)
+            self.dwell(start, self.slide_duration)
     
     def _display_list(self, items, color):
         """Display list of items using vertical scroll"""
+        # Translate all items
+        per_item = [self.translator.translate_multi(item, self.languages) for item in items]
         for lang in self.languages:
-            # Translate all items
-            translated = [self.translator.translate(item, lang) for item in items]
+            translated = [t[lang] for t in per_item]
             
             # Show each item scrolling up
             for item in translated:
+                start = time.monotonic()
                 if len(item) <= 10:
                     self.sign.display(item, color)
                 else:
                     self.sign.scroll_h(f"   {item}   ", color)
-                time.sleep(2)
+                self.dwell(start, 2)
             
             time.sleep(1)  # Pause between languages
     
+    def dwell(self, start, seconds):
+        """Hold a slide until `seconds` after `start`, counting time spent posting"""
+        remaining = start + seconds - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+    
     def set_languages(self, languages):
         """Update active languages"""
         self.languages = languages
@@ -9,10 +9,15 @@ Features:
 """
 
 import asyncio
+import functools
 import json
 import os
+import random
+import shutil
 import sqlite3
 import subprocess
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -30,6 +35,33 @@ except ImportError:
     subprocess.run(["pip", "install", "requests"])
     import requests
 
+try:
+    import aiohttp
+except ImportError:
+    print("Installing aiohttp...")
+    subprocess.run(["pip", "install", "aiohttp"])
+    import aiohttp
+
+try:
+    import aioconsole  # pip install aioconsole; offline prompt without a parked thread
+except ImportError:
+    aioconsole = None
+
+try:
+    import orjson  # pip install orjson; much faster parse/encode on the Pi
+    
+    def _loads(data):
+        return orjson.loads(data)
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+    
+    def _dumps(obj):
+        return json.dumps(obj)
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -55,8 +87,17 @@ CONFIG = {
     
     # Timing
     "heartbeat_interval": 5,
-    "reconnect_delay": 5,
+    "reconnect_delay": 5,        # base delay, doubled per failed attempt
+    "reconnect_max_delay": 600,  # backoff cap (10 min)
     "network_check_interval": 30,
+    
+    # Dashboard sync
+    "sync_batch_bytes": 64 * 1024,  # approx. max bytes per offline_message_batch frame
+    "send_timeout": 5,  # seconds before a stuck websocket send counts as a dead link
+    "template_ttl": 3600,  # seconds the cached template list is trusted without asking
+    
+    # Logging
+    "debug": False,  # print every received websocket message
 }
 
 # Expand paths
@@ -108,6 +149,9 @@ EMERGENCY_TEMPLATES = {
     }
 }
 
+# Shown when the dashboard asks for a template we don't know
+_DEFAULT_EMERGENCY = EMERGENCY_TEMPLATES["evacuate"]
+
 
 # =============================================================================
 # NETWORK MANAGER
@@ -130,8 +174,32 @@ class NetworkManager:
         except:
             return False
     
+    def _default_route_interface(self):
+        """Interface of the lowest-metric default route, read from /proc/net/route"""
+        best = None
+        with open("/proc/net/route") as f:
+            next(f)  # header
+            for line in f:
+                fields = line.split()
+                # Iface Destination Gateway Flags RefCnt Use Metric ...
+                if fields[1] != "00000000" or not int(fields[3], 16) & 0x1:
+                    continue  # not a default route, or not up
+                metric = int(fields[6])
+                if best is None or metric < best[0]:
+                    best = (metric, fields[0])
+        return best[1] if best else None
+    
     def get_active_interface(self):
         """Detect which network interface is active"""
+        try:
+            # Read the routing table in-process instead of forking `ip` every check
+            iface = self._default_route_interface()
+            if iface in CONFIG["interfaces"]:
+                self.current_interface = iface
+                self.is_cellular = iface in ["ppp0", "usb0", "wwan0"]
+                return iface
+        except:
+            pass
         try:
             result = subprocess.run(
                 ["ip", "route", "get", "8.8.8.8"],
@@ -144,6 +212,9 @@ class NetworkManager:
                     return iface
         except:
             pass
+        # No usable route: record it, so losing the link shows up as a change
+        self.current_interface = None
+        self.is_cellular = False
         return None
     
     def get_signal_strength(self):
@@ -183,6 +254,22 @@ class NetworkManager:
         
         print("⚠️ Cellular failover not configured")
         return False
+    
+    def disable_cellular(self):
+        """Take the cellular connection back down"""
+        print("📴 Disabling cellular")
+        try:
+            subprocess.run(["nmcli", "con", "down", "cellular"], timeout=30)
+            return True
+        except:
+            pass
+        
+        try:
+            subprocess.run(["poff", "cellular"], timeout=30)
+            return True
+        except:
+            pass
+        return False
 
 
 # =============================================================================
@@ -195,80 +282,103 @@ class LocalCache:
     def __init__(self):
         os.makedirs(CONFIG["cache_dir"], exist_ok=True)
         self.db_path = os.path.join(CONFIG["cache_dir"], "cache.db")
+        # One connection for the process; reopening per call fsyncs on every close
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self._lock = threading.Lock()
         self._init_db()
     
     def _init_db(self):
         """Initialize SQLite cache database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS templates
-                     (id TEXT PRIMARY KEY, name TEXT, content TEXT, 
-                      priority INTEGER, category TEXT, data TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS pending_messages
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      content TEXT, created_at TEXT, sent INTEGER DEFAULT 0)''')
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS templates
+                         (id TEXT PRIMARY KEY, name TEXT, content TEXT, 
+                          priority INTEGER, category TEXT, data TEXT)''')
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS pending_messages
+                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                          content TEXT, created_at TEXT, sent INTEGER DEFAULT 0)''')
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS meta
+                         (key TEXT PRIMARY KEY, value TEXT)''')
     
     def cache_templates(self, templates):
         """Cache templates from dashboard"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        for t in templates:
-            c.execute('''INSERT OR REPLACE INTO templates 
-                        (id, name, content, priority, category, data)
-                        VALUES (?, ?, ?, ?, ?, ?)''',
-                     (t["id"], t.get("name"), t.get("body", t.get("content")),
-                      t.get("priority", 50), t.get("category"), json.dumps(t)))
-        conn.commit()
-        conn.close()
+        rows = [(t["id"], t.get("name"), t.get("body", t.get("content")),
+                 t.get("priority", 50), t.get("category"), _dumps(t))
+                for t in templates]
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany('''INSERT OR REPLACE INTO templates 
+                            (id, name, content, priority, category, data)
+                            VALUES (?, ?, ?, ?, ?, ?)''', rows)
+                self.conn.execute("COMMIT")
+            except:
+                self.conn.execute("ROLLBACK")
+                raise
         print(f"💾 Cached {len(templates)} templates")
     
+    def get_templates_version(self):
+        """ETag and sync time (epoch seconds) of the cached template list"""
+        with self._lock:
+            rows = dict(self.conn.execute(
+                "SELECT key, value FROM meta WHERE key IN ('templates_etag', 'templates_ts')"
+            ).fetchall())
+        return rows.get("templates_etag"), float(rows.get("templates_ts", 0))
+    
+    def set_templates_version(self, etag):
+        """Record a successful template sync (or revalidation)"""
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                  [("templates_etag", etag or ""),
+                                   ("templates_ts", str(time.time()))])
+    
     def get_template(self, template_id):
         """Get template from cache"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT data FROM templates WHERE id = ?", (template_id,))
-        row = c.fetchone()
-        conn.close()
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM templates WHERE id = ?",
+                                    (template_id,)).fetchone()
         if row:
-            return json.loads(row[0])
+            return _loads(row[0])
         return None
     
     def get_emergency_templates(self):
         """Get cached emergency templates"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT data FROM templates WHERE category = 'emergency'")
-        rows = c.fetchall()
-        conn.close()
-        return [json.loads(r[0]) for r in rows]
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM templates WHERE category = 'emergency'").fetchall()
+        return [_loads(r[0]) for r in rows]
     
     def queue_message(self, content):
         """Queue a message for later sync"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("INSERT INTO pending_messages (content, created_at) VALUES (?, ?)",
-                 (content, datetime.utcnow().isoformat()))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.conn.execute("INSERT INTO pending_messages (content, created_at) VALUES (?, ?)",
+                              (content, datetime.utcnow().isoformat()))
     
     def get_pending_messages(self):
         """Get messages waiting to be synced"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT id, content FROM pending_messages WHERE sent = 0")
-        rows = c.fetchall()
-        conn.close()
-        return rows
+        with self._lock:
+            return self.conn.execute(
+                "SELECT id, content, created_at FROM pending_messages WHERE sent = 0 "
+                "ORDER BY id").fetchall()
     
     def mark_sent(self, msg_id):
         """Mark a queued message as sent"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("UPDATE pending_messages SET sent = 1 WHERE id = ?", (msg_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.conn.execute("UPDATE pending_messages SET sent = 1 WHERE id = ?", (msg_id,))
+    
+    def mark_sent_many(self, msg_ids):
+        """Mark several queued messages as sent in one transaction"""
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany("UPDATE pending_messages SET sent = 1 WHERE id = ?",
+                                      [(msg_id,) for msg_id in msg_ids])
+                self.conn.execute("COMMIT")
+            except:
+                self.conn.execute("ROLLBACK")
+                raise
 
 
 # =============================================================================
@@ -282,6 +392,7 @@ class DisplayManager:
         self.matrix_ip = matrix_portal_ip
         self.current_message = None
         self.current_color = "green"
+        self._http = requests.Session()  # keep-alive to the Matrix Portal
     
     async def display(self, content, priority=50, color=None):
         """Display message on LED panel"""
@@ -302,7 +413,7 @@ class DisplayManager:
         # Send to Matrix Portal if configured
         if self.matrix_ip:
             try:
-                requests.post(
+                self._http.post(
                     f"http://{self.matrix_ip}/display",
                     json={"text": content, "color": self.current_color},
                     timeout=5
@@ -317,7 +428,7 @@ class DisplayManager:
         
         if self.matrix_ip:
             try:
-                requests.post(f"http://{self.matrix_ip}/clear", timeout=5)
+                self._http.post(f"http://{self.matrix_ip}/clear", timeout=5)
             except:
                 pass
 
@@ -326,31 +437,38 @@ class DisplayManager:
 # AUDIO MANAGER  
 # =============================================================================
 
+# Available TTS engine: piper (best quality), espeak (fallback) or None
+TTS_ENGINE = "piper" if shutil.which("piper") else ("espeak" if shutil.which("espeak") else None)
+
+
 class AudioManager:
     """Manages TTS and audio announcements"""
     
     def __init__(self):
-        self.tts_engine = self._detect_tts()
+        self.tts_engine = TTS_ENGINE
+        self._piper = None  # long-lived piper -> aplay pipeline, started on first use
+        self._aplay = None
     
-    def _detect_tts(self):
-        """Detect available TTS engine"""
-        # Check for piper (best quality)
+    async def _start_piper(self):
+        """Start piper once, streaming its raw audio straight into aplay"""
+        read_fd, write_fd = os.pipe()
         try:
-            result = subprocess.run(["which", "piper"], capture_output=True)
-            if result.returncode == 0:
-                return "piper"
-        except:
-            pass
-        
-        # Check for espeak (fallback)
-        try:
-            result = subprocess.run(["which", "espeak"], capture_output=True)
-            if result.returncode == 0:
-                return "espeak"
-        except:
-            pass
-        
-        return None
+            self._aplay = await asyncio.create_subprocess_exec(
+                "aplay", "-r", "22050", "-f", "S16_LE", "-",
+                stdin=read_fd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            self._piper = await asyncio.create_subprocess_exec(
+                "piper", "--model", f"en_US-lessac-medium", "--output-raw",
+                stdin=subprocess.PIPE,
+                stdout=write_fd
+            )
+        finally:
+            os.close(read_fd)  # the children hold their own copies
+            os.close(write_fd)
+    
+    def _piper_alive(self):
+        return (self._piper is not None and self._piper.returncode is None
+                and self._aplay.returncode is None)
     
     async def speak(self, text, language="en"):
         """Speak text using TTS"""
@@ -361,20 +479,24 @@ class AudioManager:
         print(f"🔊 Speaking: {text[:50]}...")
         
         try:
+            # Run TTS as asyncio subprocesses so the websocket keeps being serviced
             if self.tts_engine == "piper":
-                # Piper TTS (high quality, fast)
-                process = subprocess.Popen(
-                    ["piper", "--model", f"en_US-lessac-medium", "--output-raw"],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE
-                )
-                audio_data, _ = process.communicate(text.encode())
-                # Play with aplay
-                subprocess.run(["aplay", "-r", "22050", "-f", "S16_LE", "-"],
-                             input=audio_data, capture_output=True)
+                # Piper TTS (high quality, fast); the voice model stays loaded and
+                # its audio streams straight into aplay
+                if not self._piper_alive():
+                    for proc in (self._piper, self._aplay):
+                        if proc is not None and proc.returncode is None:
+                            proc.terminate()
+                    await self._start_piper()
+                # piper synthesizes one utterance per input line
+                self._piper.stdin.write(" ".join(text.split()).encode() + b"\n")
+                await self._piper.stdin.drain()
             else:
                 # espeak fallback
-                subprocess.run(["espeak", text], capture_output=True, timeout=30)
+                process = await asyncio.create_subprocess_exec(
+                    "espeak", text, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                await asyncio.wait_for(process.wait(), timeout=30)
         except Exception as e:
             print(f"⚠️ TTS error: {e}")
 
@@ -383,12 +505,24 @@ class AudioManager:
 # MAIN SIGN CLIENT
 # =============================================================================
 
+# Heartbeat frame with the constant parts pre-serialized; only the
+# per-tick fields are encoded each interval. TODO: Real battery monitoring
+HEARTBEAT_TEMPLATE = (
+    '{{"type":"heartbeat","data":{{"battery":100,"signal_strength":{ss},'
+    '"network_type":{nt},{cs}"interface":{iface},'
+    '"changed":{changed},"crowd_count":0,"crowd_density":0}}}}'
+)
+
 class SignClient:
     """Main sign client with failover support"""
     
     def __init__(self):
         self.sign_id = self._load_sign_id()
         self.ws = None
+        self._http = None  # aiohttp session for dashboard REST, created on first use
+        self._ws_prewarm = None  # websocket handshake started during registration
+        self._tx_queue = asyncio.Queue(maxsize=32)  # outgoing frames for _writer
+        self._cellular_cleanup = None  # takes down a modem WiFi no longer needs
         self.connected = False
         self.offline_mode = False
         
@@ -396,19 +530,75 @@ class SignClient:
         self.cache = LocalCache()
         self.display = DisplayManager()
         self.audio = AudioManager()
+        
+        # Dashboard message types; anything else is ignored
+        self._handlers = {
+            "new_message": self._display_message,
+            "clear_message": lambda data: self.display.clear(),
+            "emergency": self._handle_emergency,
+        }
+        
+        # Offline console commands; a handler returning True leaves offline mode
+        self._offline_handlers = {
+            cmd: functools.partial(self._offline_template, cmd, template)
+            for cmd, template in EMERGENCY_TEMPLATES.items()
+        }
+        self._offline_handlers.update({
+            "clear": self._offline_clear,
+            "reconnect": self._offline_reconnect,
+            "quit": self._offline_quit,
+        })
     
     def _load_sign_id(self):
         """Load persisted sign ID"""
         try:
             with open(CONFIG["sign_id_file"], "r") as f:
                 return f.read().strip()
-        except:
+        except OSError:
             return None
     
     def _save_sign_id(self, sign_id):
-        """Persist sign ID"""
-        with open(CONFIG["sign_id_file"], "w") as f:
+        """Persist sign ID (write-then-rename so a power cut can't leave it truncated)"""
+        tmp = CONFIG["sign_id_file"] + ".tmp"
+        with open(tmp, "w") as f:
             f.write(sign_id)
+        os.replace(tmp, CONFIG["sign_id_file"])
+    
+    async def _http_session(self):
+        """Dashboard HTTP session (must be created inside the running loop)"""
+        if self._http is None or self._http.closed:
+            # Small keep-alive pool: register and template sync reuse one connection
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, limit_per_host=2,
+                                               keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._http
+    
+    async def close(self):
+        """Release network resources"""
+        await self._discard_prewarm()
+        cleanup, self._cellular_cleanup = self._cellular_cleanup, None
+        if cleanup is not None:
+            cleanup.cancel()
+            try:
+                await cleanup
+            except (asyncio.CancelledError, Exception):
+                pass  # shutting down; just retrieve it
+        if self._http is not None:
+            await self._http.close()
+    
+    async def _discard_prewarm(self):
+        """Cancel or close a pre-opened websocket that won't be used"""
+        task, self._ws_prewarm = self._ws_prewarm, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            ws = await task
+        except (asyncio.CancelledError, Exception):
+            return  # cancelled, or the handshake failed; either way it's retrieved
+        await ws.close()
     
     async def register(self):
         """Register with dashboard"""
@@ -425,58 +615,85 @@ class SignClient:
         }
         
         try:
-            resp = requests.post(
-                url, json=data, 
-                params={"zone": CONFIG["sign_zone"]},
-                timeout=10
-            )
-            if resp.ok:
-                result = resp.json()
+            session = await self._http_session()
+            async with session.post(
+                url, json=data,
+                params={"zone": CONFIG["sign_zone"]}
+            ) as resp:
+                body = await resp.read()
+            if resp.status < 400:
+                result = _loads(body)
                 self.sign_id = result["id"]
-                self._save_sign_id(self.sign_id)
+                await asyncio.to_thread(self._save_sign_id, self.sign_id)
                 print(f"✅ Registered as: {self.sign_id}")
                 
+                # Start the websocket handshake while templates download
+                self._ws_prewarm = asyncio.create_task(self._open_ws())
+                
                 # Cache templates
                 await self._sync_templates()
                 return True
             else:
-                print(f"❌ Registration failed: {resp.text}")
-        except requests.exceptions.ConnectionError:
+                print(f"❌ Registration failed: {body.decode(errors='replace')}")
+        except aiohttp.ClientConnectionError:
             print("❌ Cannot reach dashboard - entering offline mode")
             self.offline_mode = True
         except Exception as e:
             print(f"❌ Registration error: {e}")
         
+        await self._discard_prewarm()
         return False
     
     async def _sync_templates(self):
         """Sync templates from dashboard to local cache"""
+        etag, synced_at = self.cache.get_templates_version()
+        if time.time() - synced_at < CONFIG["template_ttl"]:
+            return  # cache is still fresh
         try:
             host = CONFIG["dashboard_host"]
             port = CONFIG["dashboard_port"]
-            resp = requests.get(f"http://{host}:{port}/api/templates", timeout=10)
-            if resp.ok:
-                self.cache.cache_templates(resp.json())
+            session = await self._http_session()
+            headers = {"If-None-Match": etag} if etag else None
+            async with session.get(f"http://{host}:{port}/api/templates",
+                                   headers=headers) as resp:
+                if resp.status == 304:
+                    self.cache.set_templates_version(etag)  # unchanged; renew the lease
+                elif resp.status < 400:
+                    self.cache.cache_templates(_loads(await resp.read()))
+                    self.cache.set_templates_version(resp.headers.get("ETag"))
         except Exception as e:
             print(f"⚠️ Template sync failed: {e}")
     
+    def _ws_uri(self):
+        host = CONFIG["dashboard_host"]
+        port = CONFIG["dashboard_port"]
+        return f"ws://{host}:{port}/ws/sign/{self.sign_id}"
+    
+    async def _open_ws(self):
+        """Open the dashboard websocket"""
+        return await websockets.connect(self._ws_uri(), ping_interval=20)
+    
     async def connect(self):
         """Connect to dashboard with failover"""
         # Check if we have a sign ID, if not register
         if not self.sign_id:
             if not await self.register():
                 if self.offline_mode:
+                    await self._discard_prewarm()
                     await self.run_offline()
                 return
         
-        host = CONFIG["dashboard_host"]
-        port = CONFIG["dashboard_port"]
-        uri = f"ws://{host}:{port}/ws/sign/{self.sign_id}"
+        uri = self._ws_uri()
         
         retry_count = 0
         max_retries_before_cellular = 3
+        attempt = 0  # consecutive failures, drives the backoff
+        cellular_task = None  # modem bring-up started during the last WiFi retry
         
         while True:
+            min_delay = 0  # floor for the next backoff, raised by server close codes
+            close_code = None
+            
             # Check network
             interface = self.network.get_active_interface()
             if interface:
@@ -485,103 +702,227 @@ class SignClient:
             
             try:
                 print(f"🔌 Connecting to {uri}")
-                async with websockets.connect(uri, ping_interval=20) as ws:
+                if self._ws_prewarm is not None:
+                    opening, self._ws_prewarm = self._ws_prewarm, None
+                    ws = await opening
+                else:
+                    ws = await self._open_ws()
+                tasks = []
+                try:
                     self.ws = ws
                     self.connected = True
                     self.offline_mode = False
                     retry_count = 0
+                    attempt = 0
+                    if cellular_task is not None:
+                        # WiFi recovered before the pre-started modem was needed
+                        self._cellular_cleanup = asyncio.create_task(
+                            self._abandon_cellular(cellular_task))
+                    cellular_task = None
                     
                     print("✅ Connected to dashboard!")
                     
                     # Sync any pending messages
                     await self._sync_pending()
                     
-                    # Start tasks
-                    heartbeat_task = asyncio.create_task(self._heartbeat())
-                    network_task = asyncio.create_task(self._monitor_network())
+                    # Start tasks; frames queued for a previous link are stale, drop them
+                    self._tx_queue = asyncio.Queue(maxsize=32)
+                    tasks.append(asyncio.create_task(self._writer(ws)))
+                    tasks.append(asyncio.create_task(self._heartbeat()))
                     
                     # Listen for messages
                     async for message in ws:
-                        await self._handle_message(json.loads(message))
+                        await self._handle_message(_loads(message))
+                    # A clean close (1000/1001) ends the loop instead of raising
+                    close_code = ws.close_code
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await ws.close()
                     
-            except websockets.exceptions.ConnectionClosed:
-                print("🔌 Connection closed")
+            except websockets.exceptions.ConnectionClosed as e:
+                close_code = e.rcvd.code if getattr(e, "rcvd", None) else getattr(e, "code", None)
             except Exception as e:
                 print(f"❌ Connection error: {e}")
                 retry_count += 1
             
+            if close_code is not None:
+                print(f"🔌 Connection closed ({close_code})")
+                # attempt was reset when the link came up, so a clean close (1000)
+                # or a plain drop gets the shortest backoff
+                if close_code == 1013:
+                    # Try Again Later: the dashboard is overloaded, stay away a while
+                    min_delay = 30 + random.uniform(0, 30)
+                elif close_code == 1012:
+                    # Service Restart: one backoff step longer than a plain drop
+                    attempt = 1
+            
             self.connected = False
             
             # Failover logic
+            if (retry_count == max_retries_before_cellular - 1 and cellular_task is None
+                    and not self.network.is_cellular):
+                # Bring the modem up alongside the last WiFi retry, not after it
+                cellular_task = asyncio.create_task(
+                    asyncio.to_thread(self.network.enable_cellular))
+            
             if retry_count >= max_retries_before_cellular:
                 if not self.network.is_cellular:
                     print("🔄 Primary connection failed, trying cellular...")
-                    if self.network.enable_cellular():
+                    if cellular_task is None:
+                        cellular_task = asyncio.create_task(
+                            asyncio.to_thread(self.network.enable_cellular))
+                    cellular_up = await cellular_task
+                    cellular_task = None
+                    if cellular_up:
                         retry_count = 0
+                        await self._discard_prewarm()  # dialed over the old link
                         await asyncio.sleep(10)  # Wait for cellular to connect
                         continue
                     else:
                         print("📴 Entering offline mode")
+                        await self._discard_prewarm()
                         await self.run_offline()
                         return
             
-            await asyncio.sleep(CONFIG["reconnect_delay"])
+            # Exponential backoff with full jitter so a fleet of signs doesn't
+            # reconnect in lockstep when the dashboard restarts
+            delay = max(min_delay, random.uniform(0, min(CONFIG["reconnect_delay"] * (2 ** attempt),
+                                                         CONFIG["reconnect_max_delay"])))
+            attempt += 1
+            print(f"⏳ Reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    async def _abandon_cellular(self, task):
+        """Wait out a modem bring-up (it can't be cancelled), then take it back down"""
+        if not await task:
+            return
+        # Decide on the route as it is now, after the modem had its chance to claim it:
+        # if traffic already rides cellular, tearing it down would drop the live link
+        interface = await asyncio.to_thread(self.network.get_active_interface)
+        if interface in ("ppp0", "usb0", "wwan0"):
+            print(f"📶 Keeping cellular, it carries the default route ({interface})")
+            return
+        await asyncio.to_thread(self.network.disable_cellular)
     
     async def _heartbeat(self):
-        """Send periodic heartbeat"""
+        """Periodic jobs on one monotonic timer: heartbeat frame and network check"""
+        hb_every = CONFIG["heartbeat_interval"]
+        nw_every = CONFIG["network_check_interval"]
+        next_hb = next_nw = time.monotonic()
+        changed = False  # network change not yet reported
         while self.connected:
+            now = time.monotonic() + 0.01  # timers can fire a hair early
             try:
-                signal = self.network.get_signal_strength()
-                await self.ws.send(json.dumps({
-                    "type": "heartbeat",
-                    "data": {
-                        "battery": 100,  # TODO: Real battery monitoring
-                        "signal_strength": 95 if not self.network.is_cellular else 70,
-                        "network_type": "cellular" if self.network.is_cellular else "wifi",
-                        "cellular_signal": signal,
-                        "crowd_count": 0,
-                        "crowd_density": 0
-                    }
-                }))
-            except:
-                break
-            await asyncio.sleep(CONFIG["heartbeat_interval"])
+                # Network check rides along with the heartbeat: one wake-up, one frame
+                if now >= next_nw:
+                    next_nw += nw_every
+                    previous = self.network.current_interface
+                    interface = self.network.get_active_interface()
+                    if interface != previous:
+                        changed = True
+                        print(f"🔄 Network changed: {interface}")
+                if now >= next_hb:
+                    next_hb += hb_every
+                    cellular = self.network.is_cellular
+                    # Modem signal only means anything on cellular; omit it on WiFi
+                    signal = self.network.get_signal_strength() if cellular else None
+                    self._send_later(HEARTBEAT_TEMPLATE.format(
+                        ss=70 if cellular else 95,
+                        nt='"cellular"' if cellular else '"wifi"',
+                        cs=f'"cellular_signal":{_dumps(signal)},' if signal is not None else "",
+                        iface=_dumps(self.network.current_interface),
+                        changed="true" if changed else "false"
+                    ))
+                    changed = False
+            except Exception as e:
+                print(f"⚠️ Heartbeat error: {e}")
+            # Sleep to the next deadline, not a fixed interval, so work time doesn't drift the schedule
+            await asyncio.sleep(max(0, min(next_hb, next_nw) - time.monotonic()))
     
-    async def _monitor_network(self):
-        """Monitor network quality"""
-        while self.connected:
-            await asyncio.sleep(CONFIG["network_check_interval"])
-            interface = self.network.get_active_interface()
-            if interface != self.network.current_interface:
-                print(f"🔄 Network changed: {interface}")
+    def _send_later(self, payload):
+        """Queue a frame for the writer; drops the oldest if the link is backed up"""
+        try:
+            self._tx_queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self._tx_queue.get_nowait()
+            self._tx_queue.put_nowait(payload)
+    
+    async def _writer(self, ws):
+        """Drain queued frames to the websocket"""
+        while True:
+            frames = [await self._tx_queue.get()]
+            # Never wait to batch, but combine whatever is already queued
+            while not self._tx_queue.empty():
+                frames.append(self._tx_queue.get_nowait())
+            if len(frames) == 1:
+                payload = frames[0]
+            else:
+                # Frames are already JSON text; splice rather than re-encode
+                payload = '{"type":"batch","items":[' + ",".join(frames) + ']}'
+            if not await self._safe_send(ws, payload):
+                return  # connection is gone; connect() will restart us
+    
+    async def _safe_send(self, ws, obj):
+        """Send one frame with a bounded wait; on failure mark the link down"""
+        payload = obj if isinstance(obj, str) else _dumps(obj)
+        try:
+            await asyncio.wait_for(ws.send(payload), timeout=CONFIG["send_timeout"])
+            return True
+        except (asyncio.TimeoutError, websockets.exceptions.ConnectionClosed) as e:
+            print(f"⚠️ Send failed: {str(e) or 'timed out'}")
+            self.connected = False  # connect()'s finally closes the socket
+            return False
     
     async def _sync_pending(self):
         """Sync any messages queued while offline"""
         pending = self.cache.get_pending_messages()
-        if pending:
-            print(f"📤 Syncing {len(pending)} pending messages...")
-            for msg_id, content in pending:
-                try:
-                    # Report to dashboard that we displayed this message
-                    await self.ws.send(json.dumps({
-                        "type": "offline_message_report",
-                        "content": content
-                    }))
-                    self.cache.mark_sent(msg_id)
-                except:
-                    break
+        if not pending:
+            return
+        print(f"📤 Syncing {len(pending)} pending messages...")
+        # Repeats of the same command collapse into one report carrying the
+        # newest entry, how many times it ran and when it last ran
+        reports = {}
+        for msg_id, content, created_at in pending:
+            report = reports.pop(content, None)  # re-insert so order follows the latest run
+            ids = report["ids"] if report else []
+            ids.append(msg_id)
+            reports[content] = {"id": msg_id, "content": content, "count": len(ids),
+                                "last_ts": created_at, "ids": ids}
+        # Report to dashboard that we displayed these messages, batched into
+        # frames of about sync_batch_bytes instead of one frame per message
+        # Whatever isn't sent stays queued for the next connection
+        batch, ids, size = [], [], 0
+        for report in reports.values():
+            ids.extend(report.pop("ids"))
+            batch.append(report)
+            size += len(report["content"]) + 64  # rough per-entry JSON overhead
+            if size >= CONFIG["sync_batch_bytes"]:
+                if not await self._send_offline_batch(batch, ids):
+                    return
+                batch, ids, size = [], [], 0
+        if batch:
+            await self._send_offline_batch(batch, ids)
+    
+    async def _send_offline_batch(self, batch, msg_ids):
+        """Send one batch of offline reports and mark the queued rows behind them sent"""
+        sent = await self._safe_send(self.ws, {
+            "type": "offline_message_batch",
+            "messages": batch
+        })
+        if sent:
+            self.cache.mark_sent_many(msg_ids)
+        return sent
     
     async def _handle_message(self, data):
         """Handle incoming message"""
         msg_type = data.get("type")
-        print(f"📨 Received: {msg_type}")
+        if CONFIG["debug"]:
+            print(f"📨 Received: {msg_type}")
         
-        if msg_type == "new_message":
-            await self._display_message(data.get("data", {}))
-        elif msg_type == "clear_message":
-            await self.display.clear()
-        elif msg_type == "emergency":
-            await self._handle_emergency(data.get("data", {}))
+        handler = self._handlers.get(msg_type)
+        if handler:
+            await handler(data.get("data", {}))
     
     async def _display_message(self, message):
         """Display a message"""
@@ -596,19 +937,19 @@ class SignClient:
         
         # Acknowledge
         if self.ws:
-            try:
-                await self.ws.send(json.dumps({
-                    "type": "ack",
-                    "message_id": message.get("id")
-                }))
-            except:
-                pass
+            self._send_later(_dumps({
+                "type": "ack",
+                "message_id": message.get("id")
+            }))
     
     async def _handle_emergency(self, data):
         """Handle emergency with high priority"""
         template_key = data.get("template", "evacuate")
-        template = EMERGENCY_TEMPLATES.get(template_key, EMERGENCY_TEMPLATES["evacuate"])
-        
+        template = EMERGENCY_TEMPLATES.get(template_key) or _DEFAULT_EMERGENCY
+        await self._show_template(template)
+    
+    async def _show_template(self, template):
+        """Display an emergency template, with audio if it has any"""
         await self.display.display(
             template["content"],
             template["priority"],
@@ -618,6 +959,24 @@ class SignClient:
         if template.get("audio"):
             await self.audio.speak(template["content"])
     
+    async def _offline_template(self, cmd, template):
+        await self._show_template(template)
+        # Queue for later sync
+        self.cache.queue_message(f"OFFLINE: {cmd}")
+    
+    async def _offline_clear(self):
+        await self.display.clear()
+    
+    async def _offline_reconnect(self):
+        print("🔄 Attempting to reconnect...")
+        self.offline_mode = False
+        await self.connect()
+        return True
+    
+    async def _offline_quit(self):
+        print("👋 Shutting down")
+        return True
+    
     async def run_offline(self):
         """Run in offline mode with local capabilities"""
         print("\n" + "="*50)
@@ -635,38 +994,19 @@ class SignClient:
         
         while True:
             try:
-                cmd = await asyncio.get_event_loop().run_in_executor(
-                    None, input, "offline> "
-                )
+                if aioconsole:
+                    cmd = await aioconsole.ainput("offline> ")
+                else:
+                    cmd = await asyncio.get_event_loop().run_in_executor(
+                        None, input, "offline> "
+                    )
                 cmd = cmd.strip().lower()
                 
-                if cmd in EMERGENCY_TEMPLATES:
-                    template = EMERGENCY_TEMPLATES[cmd]
-                    await self.display.display(
-                        template["content"],
-                        template["priority"],
-                        template["color"]
-                    )
-                    if template.get("audio"):
-                        await self.audio.speak(template["content"])
-                    # Queue for later sync
-                    self.cache.queue_message(f"OFFLINE: {cmd}")
-                    
-                elif cmd == "clear":
-                    await self.display.clear()
-                    
-                elif cmd == "reconnect":
-                    print("🔄 Attempting to reconnect...")
-                    self.offline_mode = False
-                    await self.connect()
-                    return
-                    
-                elif cmd == "quit":
-                    print("👋 Shutting down")
-                    return
-                    
-                else:
+                handler = self._offline_handlers.get(cmd)
+                if handler is None:
                     print(f"Unknown command: {cmd}")
+                elif await handler():
+                    return
                     
             except (EOFError, KeyboardInterrupt):
                 print("\n👋 Shutting down")
@@ -693,6 +1033,8 @@ async def main():
         await client.connect()
     except KeyboardInterrupt:
         print("\n👋 Shutting down")
+    finally:
+        await client.close()
 
 
 if __name__ == "__main__":